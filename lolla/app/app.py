@@ -1,29 +1,105 @@
 """A Dash app that generates a fake Lolalapooza schedule lineup and visualizes it in a table format."""
 
+import json
+import logging
+import os
+from concurrent.futures import wait
+from typing import Optional
+
 import dash
 from dash import Input, Output, State, html, dcc, dash_table
 import dash_bootstrap_components as dbc
+from flask import Response
 
-from lolla.app.schedule_table import get_schedule_datatable_data
-from lolla.app.youtube import get_youtube_video_id, create_youtube_embed
+from lolla.app.schedule_pool import SchedulePool
+from lolla.app.schedule_store import ScheduleStore
+from lolla.app.schedule_table import HIGHLIGHT_STYLE, get_schedule_datatable_data
+from lolla.app.video_cache import VideoCache
+from lolla.app.video_providers import CachedVideoProvider, LocalVideoProvider, VideoProvider
+from lolla.app.video_lookup import VideoLookup
+from lolla.app.video_modal import LOADING_MESSAGE, lookup_modal, message_modal
+from lolla.app.youtube import YouTubeProvider
 from lolla.app.utils import (
-    serialize_schedule_df,
-    deserialize_schedule_df,
     get_schedule_background_image_b64,
     get_landing_page_background_image_b64,
 )
-from lolla.scheduling.constants import STAGES
 from lolla.scheduling.artists import Artist
-from lolla.scheduling.generate_schedule import generate_valid_schedule
+from lolla.scheduling.generate_schedule import CanNotConvergeError, generate_valid_schedule
+from lolla.scheduling.instrumentation import SolverStats
+from lolla.scheduling.layout import DEFAULT_LAYOUT, FestivalLayout
+from lolla.scheduling.log import set_verbosity
+
+logger = logging.getLogger(__name__)
+
+
+# How long a click waits for its video lookup before showing a loading message instead
+VIDEO_LOOKUP_WAIT_SECONDS = 0.05
+# How often the browser checks on a video lookup that is still running
+VIDEO_LOOKUP_POLL_MS = 250
+
+
+def create_app(
+    layout: FestivalLayout = DEFAULT_LAYOUT,
+    validate_schedules: bool = True,
+    schedule_store: Optional[ScheduleStore] = None,
+    pool_size: int = 0,
+    pool_workers: int = 1,
+    video_provider: Optional[VideoProvider] = None,
+    video_lookup_workers: int = 4,
+) -> dash.Dash:
+    """Create the app, generating schedules with the given festival layout.
 
+    `validate_schedules` checks every generated schedule against its pandera schema, which can be turned
+    off in production to skip importing pandera altogether.
 
-def create_app() -> dash.Dash:
+    Generated schedules are kept in `schedule_store` (by default an in-memory one) and the browser only
+    holds the ID of its current schedule.
+
+    With a `pool_size`, up to that many schedules are generated ahead of time by `pool_workers` background
+    threads, so starting or regenerating a game just takes a ready schedule. Without one, every click
+    generates its schedule on the spot.
+
+    Clicking an artist plays the video `video_provider` finds for them, by default a cached YouTube search.
+    Lookups run on `video_lookup_workers` background threads while the browser shows a loading message
+    and polls for the result, so slow lookups don't hold up the server's request threads. The videos of
+    the artists in the highlighted and next hour are prefetched whenever the highlight moves.
+
+    Solver stats for every schedule the app generates are served in the Prometheus text format at /metrics.
+    """
     app = dash.Dash(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP])
     app.config.suppress_callback_exceptions = True
     app.title = "🎪 Lollapalooza Game"
+    solver_stats = SolverStats()
+    if schedule_store is None:
+        schedule_store = ScheduleStore(layout=layout)
+    if video_provider is None:
+        video_provider = CachedVideoProvider(YouTubeProvider())
+    video_lookup = VideoLookup(video_provider, video_lookup_workers)
+    schedule_pool = None
+    if pool_size > 0:
+        schedule_pool = SchedulePool(
+            pool_size, pool_workers, layout=layout, validate=validate_schedules, stats=solver_stats
+        ).start()
+
+    @app.server.route("/metrics")
+    def metrics():
+        return Response(solver_stats.to_prometheus(), mimetype="text/plain; version=0.0.4")
 
     app.layout = html.Div(
         [
+            # Shown when schedule generation runs out of attempts
+            dbc.Alert(
+                id="generation-error",
+                is_open=False,
+                dismissable=True,
+                style={
+                    "position": "fixed",
+                    "top": "10px",
+                    "left": "50%",
+                    "transform": "translateX(-50%)",
+                    "zIndex": "1100",
+                },
+            ),
             # Landing page components
             html.Div(
                 id="landing-page",
@@ -118,7 +194,7 @@ def create_app() -> dash.Dash:
                             "whiteSpace": "pre-line", # Enable line breaks for artist names
                             "height": "auto",  # Allow cells to expand vertically
                             "minHeight": "80px",  # Larger minimum height for better vertical space usage
-                            "width": f"{100 / 8}vw",  # 8 columns -- take up 100% of width
+                            "width": f"{100 / (len(layout.stages) + 1)}vw",  # A column per stage plus Time -- take up 100% of width
                             "lineHeight": "1.4",  # Better line spacing
                         },
                         style_data={
@@ -193,17 +269,27 @@ def create_app() -> dash.Dash:
             # Data stores
             dcc.Store(id="highlight-index", data=-1),
             dcc.Store(id="video-index", data=0),
-            dcc.Store(id="schedule-data", data=None),
+            dcc.Store(id="schedule-id", data=None),
+            # Cell colors of the current schedule, which the highlight rule is added to in the browser
+            dcc.Store(id="schedule-cell-styles", data=[]),
             dcc.Store(id="app-state", data="landing"),  # "landing" or "schedule"
+            # The artist whose video is still being looked up, and the timer that polls for it
+            dcc.Store(id="video-lookup-artist", data=None),
+            dcc.Interval(id="video-lookup-poll", interval=VIDEO_LOOKUP_POLL_MS, disabled=True),
+            # The hour row whose artists' videos were last prefetched
+            dcc.Store(id="video-prefetch-index", data=None),
         ]
     )
 
     @app.callback(
         [
-            Output("schedule-data", "data"),
+            Output("schedule-id", "data"),
             Output("app-state", "data"),
             Output("landing-page", "style"),
             Output("schedule-viewer", "style"),
+            Output("generation-error", "children"),
+            Output("generation-error", "color"),
+            Output("generation-error", "is_open"),
         ],
         [
             Input("start-btn", "n_clicks"),
@@ -214,18 +300,67 @@ def create_app() -> dash.Dash:
     def handle_schedule_generation(start_clicks, regenerate_clicks):
         """Generate schedule and switch to schedule view."""
         if start_clicks > 0 or regenerate_clicks > 0:
-            schedule_df = generate_valid_schedule()
-            # Convert DataFrame to dictionary for storage
-            schedule_data = serialize_schedule_df(schedule_df)
+            alert = (None, dash.no_update, False)
+            try:
+                if schedule_pool is not None:
+                    schedule_df = schedule_pool.get()
+                else:
+                    generation_stats = SolverStats()
+                    try:
+                        schedule_df = generate_valid_schedule(
+                            layout=layout, stats=generation_stats, validate=validate_schedules
+                        )
+                    finally:
+                        solver_stats.merge(generation_stats)
+            except CanNotConvergeError as e:
+                if e.schedule is None:
+                    logger.error("Schedule generation failed: %s", e)
+                    # Stay on the current page
+                    return (
+                        dash.no_update,
+                        dash.no_update,
+                        dash.no_update,
+                        dash.no_update,
+                        "Sorry, we couldn't generate a schedule. Please try again.",
+                        "danger",
+                        True,
+                    )
+                # Serve the closest schedule found rather than nothing
+                logger.warning(
+                    "Schedule generation failed (%s), serving a schedule with %s conflicts", e, e.num_conflicts
+                )
+                schedule_df = e.schedule.to_df()
+                alert = (
+                    "We couldn't find a schedule that follows every rule, so this one has a few clashes.",
+                    "warning",
+                    True,
+                )
             return (
-                schedule_data,
+                schedule_store.put(schedule_df),
                 "schedule",
                 {"display": "none"},  # hide landing page
                 {"display": "block"},  # show schedule viewer
+                *alert,
             )
         return dash.no_update
 
-    @app.callback(
+    # Moving the highlight runs entirely in the browser: the table data and cell colors only change with the schedule
+    app.clientside_callback(
+        """
+        function(prevClicks, nextClicks, currentIdx, tableData) {
+            const numRows = (tableData || []).length;
+            if (!numRows) {
+                return currentIdx;
+            }
+            const changedId = dash_clientside.callback_context.triggered_id;
+            if (changedId === "prev-btn") {
+                return Math.max(currentIdx - 1, 0);
+            } else if (changedId === "next-btn") {
+                return Math.min(currentIdx + 1, numRows - 1);
+            }
+            return currentIdx;
+        }
+        """,
         Output("highlight-index", "data"),
         [
             Input("prev-btn", "n_clicks"),
@@ -233,49 +368,76 @@ def create_app() -> dash.Dash:
         ],
         [
             State("highlight-index", "data"),
-            State("schedule-data", "data"),
+            State("schedule-table", "data"),
         ],
     )
-    def update_index(prev_clicks, next_clicks, current_idx, schedule_data):
-        if not schedule_data:
-            return current_idx
-
-        schedule_df = deserialize_schedule_df(schedule_data)
-        changed_id = dash.callback_context.triggered_id
-        if changed_id == "prev-btn":
-            return max(current_idx - 1, 0)
-        elif changed_id == "next-btn":
-            return min(current_idx + 1, len(schedule_df) - 1)
-        return current_idx
 
     @app.callback(
         [
             Output("schedule-table", "data"),
             Output("schedule-table", "columns"),
-            Output("schedule-table", "style_data_conditional"),
+            Output("schedule-cell-styles", "data"),
         ],
+        Input("schedule-id", "data"),
+    )
+    def update_schedule_display(schedule_id):
+        schedule_df = schedule_store.get(schedule_id)
+        if schedule_df is None:
+            return [], [], []
+
+        data, columns, cell_styles = get_schedule_datatable_data(schedule_df)
+        return data, columns, cell_styles
+
+    # The highlight rule goes first, so booked cells in the highlighted row keep their size color
+    app.clientside_callback(
+        f"""
+        function(currentIdx, cellStyles, tableData) {{
+            const numRows = (tableData || []).length;
+            if (currentIdx === null || currentIdx < 0 || currentIdx >= numRows) {{
+                return cellStyles;
+            }}
+            const highlight = Object.assign({{"if": {{"row_index": currentIdx}}}}, {json.dumps(HIGHLIGHT_STYLE)});
+            return [highlight].concat(cellStyles);
+        }}
+        """,
+        Output("schedule-table", "style_data_conditional"),
         [
-            Input("schedule-data", "data"),
             Input("highlight-index", "data"),
+            Input("schedule-cell-styles", "data"),
         ],
+        State("schedule-table", "data"),
     )
-    def update_schedule_display(schedule_data, current_idx):
-        if not schedule_data:
-            return [], [], []
 
-        schedule_df = deserialize_schedule_df(schedule_data)
-        data, columns, style_data_conditional = get_schedule_datatable_data(
-            schedule_df, highlight_row=current_idx
+    @app.callback(
+        Output("video-prefetch-index", "data"),
+        [
+            Input("highlight-index", "data"),
+            Input("schedule-id", "data"),
+        ],
+    )
+    def prefetch_videos(current_idx, schedule_id):
+        schedule_df = schedule_store.get(schedule_id)
+        if schedule_df is None:
+            return dash.no_update
+
+        # Before the first hour is highlighted, the next hour is the first one
+        rows = schedule_df.iloc[max(current_idx, 0) : current_idx + 2]
+        video_lookup.prefetch(
+            artist.name for artist in rows.to_numpy().ravel() if isinstance(artist, Artist)
         )
-        return data, columns, style_data_conditional
+        return current_idx
 
     @app.callback(
-        Output("video-player", "children"),
+        [
+            Output("video-player", "children"),
+            Output("video-lookup-artist", "data"),
+            Output("video-lookup-poll", "disabled"),
+        ],
         Input("schedule-table", "active_cell"),
-        State("schedule-data", "data"),
+        State("schedule-id", "data"),
     )
-    def play_video_on_click(active_cell, schedule_data):
-        if not active_cell or not schedule_data:
+    def play_video_on_click(active_cell, schedule_id):
+        if not active_cell or not schedule_id:
             return dash.no_update
 
         row = active_cell["row"]
@@ -286,222 +448,88 @@ def create_app() -> dash.Dash:
             return dash.no_update
 
         # Ensure the column is a valid stage
-        if column_id not in STAGES:
+        if column_id not in layout.stages:
             return dash.no_update
 
-        schedule_df = deserialize_schedule_df(schedule_data)
+        schedule_df = schedule_store.get(schedule_id)
 
         # Ensure we have valid indices
-        if row >= len(schedule_df):
+        if schedule_df is None or row >= len(schedule_df):
             return dash.no_update
 
         artist = schedule_df.iloc[row][column_id]
 
         if not isinstance(artist, Artist):
-            return html.Div()  # Return empty div for empty slots - cleaner UX
-
-        try:
-            video_id = get_youtube_video_id(artist.name)
-            if video_id:
-                return html.Div(
-                    [
-                        # Modal-style backdrop
-                        html.Div(
-                            style={
-                                "position": "fixed",
-                                "top": "0",
-                                "left": "0",
-                                "width": "100%",
-                                "height": "100%",
-                                "backgroundColor": "rgba(0,0,0,0.7)",
-                                "zIndex": "1000",
-                                "display": "flex",
-                                "justifyContent": "center",
-                                "alignItems": "center",
-                                "pointerEvents": "all",  # Enable clicks on modal
-                            },
-                            children=[
-                                html.Div(
-                                    [
-                                        html.Div(
-                                            [
-                                                html.H4(
-                                                    f"🎵 Now Playing: {artist.name}",
-                                                    style={
-                                                        "margin": "0 0 10px 0",
-                                                        "color": "#e74c3c",
-                                                    },
-                                                ),
-                                                html.P(
-                                                    f"{artist.size.name.title()} {artist.genre.name.title()} Artist",
-                                                    style={
-                                                        "margin": "0 0 15px 0",
-                                                        "color": "#666",
-                                                    },
-                                                ),
-                                                html.Div(
-                                                    [
-                                                        dbc.Button(
-                                                            "✕ Close",
-                                                            id="close-video-btn",
-                                                            size="sm",
-                                                            color="secondary",
-                                                            style={
-                                                                "marginRight": "10px"
-                                                            },
-                                                        ),
-                                                        dbc.Button(
-                                                            "🔗 Open in YouTube",
-                                                            href=f"https://www.youtube.com/watch?v={video_id}",
-                                                            target="_blank",
-                                                            size="sm",
-                                                            color="info",
-                                                            external_link=True,
-                                                        ),
-                                                    ],
-                                                    style={"marginBottom": "15px"},
-                                                ),
-                                            ],
-                                            style={"textAlign": "center"},
-                                        ),
-                                        html.Div(
-                                            [
-                                                create_youtube_embed(
-                                                    video_id, width="640", height="360"
-                                                )
-                                            ]
-                                        ),
-                                    ],
-                                    style={
-                                        "backgroundColor": "white",
-                                        "padding": "20px",
-                                        "borderRadius": "15px",
-                                        "boxShadow": "0 8px 32px rgba(0,0,0,0.3)",
-                                        "maxWidth": "700px",
-                                        "maxHeight": "90vh",
-                                        "overflow": "auto",
-                                    },
-                                )
-                            ],
-                        )
-                    ]
-                )
-            else:
-                return html.Div(
-                    [
-                        html.Div(
-                            [
-                                html.H5(
-                                    f"🎵 {artist.name}",
-                                    style={"color": "#e74c3c", "marginBottom": "10px"},
-                                ),
-                                html.P(
-                                    "Sorry, no video available for this artist.",
-                                    style={
-                                        "color": "#666",
-                                        "fontStyle": "italic",
-                                        "marginBottom": "15px",
-                                    },
-                                ),
-                                dbc.Button(
-                                    "✕ Close",
-                                    id="close-video-btn",
-                                    size="sm",
-                                    color="secondary",
-                                ),
-                            ],
-                            style={
-                                "backgroundColor": "white",
-                                "padding": "30px",
-                                "borderRadius": "15px",
-                                "textAlign": "center",
-                                "boxShadow": "0 4px 16px rgba(0,0,0,0.2)",
-                                "margin": "20px auto",
-                                "maxWidth": "400px",
-                                "pointerEvents": "all",  # Enable clicks on error message
-                            },
-                        )
-                    ],
-                    style={
-                        "position": "fixed",
-                        "top": "0",
-                        "left": "0",
-                        "width": "100%",
-                        "height": "100%",
-                        "backgroundColor": "rgba(0,0,0,0.5)",
-                        "zIndex": "1000",
-                        "display": "flex",
-                        "justifyContent": "center",
-                        "alignItems": "center",
-                        "pointerEvents": "all",
-                    },
-                )
-        except Exception:
-            return html.Div(
-                [
-                    html.Div(
-                        [
-                            html.H5(
-                                f"🎵 {artist.name}",
-                                style={"color": "#e74c3c", "marginBottom": "10px"},
-                            ),
-                            html.P(
-                                "Unable to load video at this time.",
-                                style={
-                                    "color": "#666",
-                                    "fontStyle": "italic",
-                                    "marginBottom": "15px",
-                                },
-                            ),
-                            dbc.Button(
-                                "✕ Close",
-                                id="close-video-btn",
-                                size="sm",
-                                color="secondary",
-                            ),
-                        ],
-                        style={
-                            "backgroundColor": "white",
-                            "padding": "30px",
-                            "borderRadius": "15px",
-                            "textAlign": "center",
-                            "boxShadow": "0 4px 16px rgba(0,0,0,0.2)",
-                            "margin": "20px auto",
-                            "maxWidth": "400px",
-                            "pointerEvents": "all",
-                        },
-                    )
-                ],
-                style={
-                    "position": "fixed",
-                    "top": "0",
-                    "left": "0",
-                    "width": "100%",
-                    "height": "100%",
-                    "backgroundColor": "rgba(0,0,0,0.5)",
-                    "zIndex": "1000",
-                    "display": "flex",
-                    "justifyContent": "center",
-                    "alignItems": "center",
-                    "pointerEvents": "all",
-                },
-            )
+            return html.Div(), None, True  # Return empty div for empty slots - cleaner UX
+
+        # Answer straight away if the lookup is quick (e.g. cached), otherwise show a loading state
+        # and let poll_video_lookup fill in the video once the lookup finishes
+        lookup = video_lookup.submit(artist.name)
+        if not wait([lookup], timeout=VIDEO_LOOKUP_WAIT_SECONDS).done:
+            return message_modal(artist, LOADING_MESSAGE), artist.to_dict(), False
+        return lookup_modal(artist, lookup), None, True
+
+    @app.callback(
+        [
+            Output("video-player", "children", allow_duplicate=True),
+            Output("video-lookup-artist", "data", allow_duplicate=True),
+            Output("video-lookup-poll", "disabled", allow_duplicate=True),
+        ],
+        Input("video-lookup-poll", "n_intervals"),
+        State("video-lookup-artist", "data"),
+        prevent_initial_call=True,
+    )
+    def poll_video_lookup(n_intervals, artist_data):
+        if not artist_data:
+            return dash.no_update, dash.no_update, True
+
+        artist = Artist.from_dict(artist_data)
+        lookup = video_lookup.get(artist.name)
+        if lookup is None:
+            return dash.no_update, None, True
+        if not lookup.done():
+            return dash.no_update
+        return lookup_modal(artist, lookup), None, True
+
 
     @app.callback(
-        Output("video-player", "children", allow_duplicate=True),
+        [
+            Output("video-player", "children", allow_duplicate=True),
+            Output("video-lookup-artist", "data", allow_duplicate=True),
+            Output("video-lookup-poll", "disabled", allow_duplicate=True),
+        ],
         Input("close-video-btn", "n_clicks"),
         prevent_initial_call=True,
     )
     def close_video(n_clicks):
         if n_clicks:
-            return html.Div()  # Clear the video player completely
+            # Clear the video player completely, and stop waiting for a lookup that is still running
+            return html.Div(), None, True
         return dash.no_update
 
     return app
 
 
 def main():
-    app = create_app()
+    set_verbosity(int(os.environ.get("LOLLA_VERBOSITY", 1)))
+    # Serve videos from a local artist to video ID mapping instead of YouTube, e.g. for offline load tests.
+    # It gets its own in-memory cache, like the real provider's, so prefetching warms it without mixing
+    # fixture video IDs into the persistent YouTube cache.
+    video_provider = None
+    if os.environ.get("LOLLA_VIDEO_FIXTURES"):
+        fixture_provider = LocalVideoProvider.from_file(
+            os.environ["LOLLA_VIDEO_FIXTURES"],
+            latency=float(os.environ.get("LOLLA_VIDEO_LATENCY", 0)),
+            jitter=float(os.environ.get("LOLLA_VIDEO_JITTER", 0)),
+        )
+        video_provider = CachedVideoProvider(fixture_provider, VideoCache(":memory:"))
+    app = create_app(
+        validate_schedules=os.environ.get("LOLLA_VALIDATE_SCHEDULES", "1") == "1",
+        schedule_store=ScheduleStore(directory=os.environ.get("LOLLA_SCHEDULE_DIR")),
+        pool_size=int(os.environ.get("LOLLA_POOL_SIZE", 4)),
+        pool_workers=int(os.environ.get("LOLLA_POOL_WORKERS", 1)),
+        video_provider=video_provider,
+    )
     app.run(debug=True)
 
 
@@ -0,0 +1,106 @@
+"""A pool of ready-made schedules, so starting or regenerating a game doesn't wait for the solver.
+
+Background threads keep a bounded queue of valid schedules topped up. Taking a schedule pops one off the queue,
+which frees a place for a refill thread to fill in its own time. If the queue is ever empty (say, just after
+startup, or when schedules are taken faster than they can be generated) the schedule is generated on the spot.
+"""
+
+import logging
+import queue
+import threading
+from typing import Optional
+
+import pandas as pd
+
+from lolla.scheduling.generate_schedule import CanNotConvergeError, generate_valid_schedule
+from lolla.scheduling.instrumentation import SolverStats
+from lolla.scheduling.layout import DEFAULT_LAYOUT, FestivalLayout
+
+logger = logging.getLogger(__name__)
+
+
+class SchedulePool:
+    """Up to `size` pre-generated valid schedules, refilled by `num_workers` background threads."""
+
+    def __init__(
+        self,
+        size: int = 4,
+        num_workers: int = 1,
+        strategy: str = "swap",
+        layout: FestivalLayout = DEFAULT_LAYOUT,
+        validate: bool = True,
+        stats: Optional[SolverStats] = None,
+    ):
+        if size < 1 or num_workers < 1:
+            raise ValueError(f"A pool needs a size and number of workers of at least 1, got {size} and {num_workers}")
+        self.size = size
+        self.num_workers = num_workers
+        self.strategy = strategy
+        self.layout = layout
+        self.validate = validate
+        self.stats = stats
+        self._schedules: queue.Queue[pd.DataFrame] = queue.Queue(maxsize=size)
+        self._stopped = threading.Event()
+        self._workers: list[threading.Thread] = []
+
+    def __len__(self) -> int:
+        """The number of schedules ready to be taken."""
+        return self._schedules.qsize()
+
+    def start(self) -> "SchedulePool":
+        """Start the refill threads. They are daemon threads, so they never keep the process alive on their own."""
+        if not self._workers:
+            self._stopped.clear()
+            self._workers = [
+                threading.Thread(target=self._refill, name=f"schedule-pool-{i}", daemon=True)
+                for i in range(self.num_workers)
+            ]
+            for worker in self._workers:
+                worker.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop refilling. A generation that is already running is finished (and dropped) first."""
+        self._stopped.set()
+        for worker in self._workers:
+            worker.join(timeout)
+        self._workers = []
+
+    def get(self) -> pd.DataFrame:
+        """Take a ready schedule, or generate one right away if none is ready."""
+        try:
+            return self._schedules.get_nowait()
+        except queue.Empty:
+            logger.info("Schedule pool is empty, generating a schedule on demand")
+            return self._generate()
+
+    def _generate(self) -> pd.DataFrame:
+        generation_stats = SolverStats()
+        try:
+            return generate_valid_schedule(
+                self.strategy, layout=self.layout, stats=generation_stats, validate=self.validate
+            )
+        finally:
+            if self.stats is not None:
+                self.stats.merge(generation_stats)
+
+    def _refill(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                schedule_df = self._generate()
+            except CanNotConvergeError:
+                logger.warning("Background schedule generation didn't converge, trying again")
+                continue
+            except Exception:
+                # Keep the pool alive: a failed generation shouldn't stop future refills
+                logger.exception("Background schedule generation failed")
+                self._stopped.wait(1.0)
+                continue
+
+            # Wait for a free place, checking now and then whether the pool has been stopped
+            while not self._stopped.is_set():
+                try:
+                    self._schedules.put(schedule_df, timeout=0.5)
+                    break
+                except queue.Full:
+                    pass
@@ -0,0 +1,86 @@
+"""Server-side storage for generated schedules, so the browser only has to hold a short schedule ID.
+
+Schedules live in an in-process LRU. With a directory configured they are also written to disk as JSON, so
+schedules evicted from memory (or generated by another worker process) can still be loaded.
+"""
+
+import json
+import secrets
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Union
+
+import pandas as pd
+
+from lolla.app.utils import deserialize_schedule_df, serialize_schedule_df
+from lolla.scheduling.layout import DEFAULT_LAYOUT, FestivalLayout
+
+
+class ScheduleStore:
+    """Generated schedules keyed by ID: the most recent `max_entries` in memory, and optionally all of them on disk."""
+
+    def __init__(
+        self,
+        max_entries: int = 128,
+        directory: Optional[Union[str, Path]] = None,
+        layout: FestivalLayout = DEFAULT_LAYOUT,
+    ):
+        if max_entries < 1:
+            raise ValueError(f"The store needs room for at least one schedule, got {max_entries}")
+        self.max_entries = max_entries
+        self.directory = Path(directory) if directory is not None else None
+        self.layout = layout
+        self._schedules: OrderedDict[str, pd.DataFrame] = OrderedDict()
+        # Dash runs callbacks on several threads, so every access to the LRU goes through the lock
+        self._lock = threading.Lock()
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+    def __len__(self) -> int:
+        return len(self._schedules)
+
+    def put(self, schedule_df: pd.DataFrame) -> str:
+        """Store a schedule and return its new ID."""
+        schedule_id = secrets.token_urlsafe(8)
+        if self.directory is not None:
+            self._path(schedule_id).write_text(json.dumps(serialize_schedule_df(schedule_df, self.layout)))
+        self._remember(schedule_id, schedule_df)
+        return schedule_id
+
+    def get(self, schedule_id: Optional[str]) -> Optional[pd.DataFrame]:
+        """The schedule with this ID, or None if it's unknown (or has been evicted and there is no disk backend)."""
+        if not schedule_id:
+            return None
+        with self._lock:
+            schedule_df = self._schedules.get(schedule_id)
+            if schedule_df is not None:
+                self._schedules.move_to_end(schedule_id)
+                return schedule_df
+
+        if self.directory is None:
+            return None
+        # IDs come back from the browser, so never use one that doesn't look like ours as a file name
+        if not _is_valid_id(schedule_id):
+            return None
+        path = self._path(schedule_id)
+        if not path.is_file():
+            return None
+        schedule_df = deserialize_schedule_df(json.loads(path.read_text()), self.layout)
+        self._remember(schedule_id, schedule_df)
+        return schedule_df
+
+    def _remember(self, schedule_id: str, schedule_df: pd.DataFrame) -> None:
+        with self._lock:
+            self._schedules[schedule_id] = schedule_df
+            self._schedules.move_to_end(schedule_id)
+            while len(self._schedules) > self.max_entries:
+                self._schedules.popitem(last=False)
+
+    def _path(self, schedule_id: str) -> Path:
+        return self.directory / f"{schedule_id}.json"
+
+
+def _is_valid_id(schedule_id: str) -> bool:
+    """Whether an ID could have come from `put` (which uses URL-safe base64)."""
+    return all(char.isalnum() or char in "-_" for char in schedule_id)
@@ -3,22 +3,48 @@
 import pandas as pd
 from typing import Optional
 
-from lolla.scheduling.constants import STAGES, HOURS
 from lolla.scheduling.artists import Artist, ArtistSize
+from lolla.scheduling.layout import DEFAULT_LAYOUT, FestivalLayout
+
+
+def _format_time(label) -> str:
+    """Format an index label, either an hour or a (day, hour) pair, as a readable time."""
+    if isinstance(label, tuple):
+        day, hour = label
+        return f"Day {day} {_format_time(hour)}"
+    return f"{label % 12 if label > 12 else label}:00"
+
+
+# Background color of a booked cell, by artist size
+SIZE_COLORS = {
+    ArtistSize.SMALL: 'rgba(227, 242, 253, 0.95)',
+    ArtistSize.MEDIUM: 'rgba(255, 243, 224, 0.95)',
+    ArtistSize.LARGE: 'rgba(255, 235, 238, 0.95)',
+}
+
+# Style of the highlighted (current hour) row
+HIGHLIGHT_STYLE = {
+    'backgroundColor': '#c8e6c9',  # Light green for highlighted row
+    'fontWeight': 'bold'
+}
 
 
 def get_schedule_datatable_data(schedule_df: pd.DataFrame, highlight_row: Optional[int] = None) -> tuple[list[dict], list[dict], list[dict]]:
-    """Get data, columns, and style_data_conditional for the schedule DataTable."""
+    """Get data, columns, and style_data_conditional for the schedule DataTable.
+
+    None of it depends on the highlighted row except the highlight rule itself (see get_highlight_style),
+    so the app computes the rest once per schedule and moves the highlight in the browser.
+    """
     # Prepare the data for DataTable
     display_df = schedule_df.copy()
 
+    stages = list(schedule_df.columns)
+
     # Convert time index to readable format
-    display_df.index = pd.Series(display_df.index).apply(
-        lambda x: f"{x % 12 if x > 12 else x}:00"
-    )
+    display_df.index = pd.Index([_format_time(label) for label in display_df.index])
 
     # Convert artists to display format
-    for stage in STAGES:
+    for stage in stages:
         display_df[stage] = display_df[stage].apply(
             lambda a: "" if pd.isna(a) else a.to_table_display()  # Show full artist display with genre icons and newlines
         )
@@ -27,62 +53,26 @@ def get_schedule_datatable_data(schedule_df: pd.DataFrame, highlight_row: Option
     display_df = display_df.reset_index()
     display_df = display_df.rename(columns={'index': 'Time'})
 
-    # Define color mapping for conditional formatting
-    def get_cell_style(schedule_df, row_idx, col_name):
-        """Get the background color for a cell based on artist size."""
-        if col_name == 'Time':
-            return 'background-color: lightgrey; font-weight: bold; text-align: center;'
-
-        original_row_idx = row_idx  # Since we reset index
-        if original_row_idx < len(schedule_df):
-            artist = schedule_df.iloc[original_row_idx][col_name]
-            if isinstance(artist, Artist):
-                color_map = {
-                        ArtistSize.SMALL: 'rgba(227, 242, 253, 0.95)',
-                        ArtistSize.MEDIUM: 'rgba(255, 243, 224, 0.95)',
-                        ArtistSize.LARGE: 'rgba(255, 235, 238, 0.95)', 
-                }
-                bg_color = color_map.get(artist.size, 'white')
-                return f'background-color: {bg_color}; text-align: center; cursor: pointer;'
-
-        return 'background-color: white; text-align: center; cursor: pointer;'
-
-    # Create conditional formatting rules
-    style_data_conditional = []
-
-    # Highlight the current hour row
-    if highlight_row is not None and 0 <= highlight_row < len(display_df):
-        style_data_conditional.append({
-            'if': {'row_index': highlight_row},
-            'backgroundColor': '#c8e6c9',  # Light green for highlighted row
-            'fontWeight': 'bold'
-        })
+    # Create conditional formatting rules, highlighting the current hour row first
+    style_data_conditional = get_highlight_style(highlight_row, len(display_df))
 
     # Add artist size-based coloring
-    for row_idx in range(len(display_df)):
-        for col_name in STAGES:
-            if row_idx < len(schedule_df):
-                artist = schedule_df.iloc[row_idx][col_name]
-                if isinstance(artist, Artist):
-                    color_map = {
-                        ArtistSize.SMALL: 'rgba(227, 242, 253, 0.95)',
-                        ArtistSize.MEDIUM: 'rgba(255, 243, 224, 0.95)',
-                        ArtistSize.LARGE: 'rgba(255, 235, 238, 0.95)', 
-                    }
-                    bg_color = color_map.get(artist.size, 'transparent')
-                    style_data_conditional.append({
-                        'if': {
-                            'row_index': row_idx,
-                            'column_id': col_name
-                        },
-                        'backgroundColor': bg_color,
-                        'cursor': 'pointer'
-                    })
+    for row_idx, row in enumerate(schedule_df.itertuples(index=False)):
+        for col_name, artist in zip(stages, row):
+            if isinstance(artist, Artist):
+                style_data_conditional.append({
+                    'if': {
+                        'row_index': row_idx,
+                        'column_id': col_name
+                    },
+                    'backgroundColor': SIZE_COLORS.get(artist.size, 'transparent'),
+                    'cursor': 'pointer'
+                })
 
     # Return data, columns, and style_data_conditional for use in callback
     columns = [
         {'name': 'Time', 'id': 'Time', 'type': 'text'},
-        *[{'name': stage, 'id': stage, 'type': 'text'} for stage in STAGES]
+        *[{'name': stage, 'id': stage, 'type': 'text'} for stage in stages]
     ]
 
     data = display_df.to_dict('records')
@@ -90,13 +80,20 @@ def get_schedule_datatable_data(schedule_df: pd.DataFrame, highlight_row: Option
     return data, columns, style_data_conditional
 
 
-def read_schedule_from_csv(file_path: str) -> pd.DataFrame:
+def get_highlight_style(highlight_row: Optional[int], num_rows: int) -> list[dict]:
+    """The style_data_conditional rules that highlight the current hour row, if it's within the table."""
+    if highlight_row is None or not 0 <= highlight_row < num_rows:
+        return []
+    return [{'if': {'row_index': highlight_row}, **HIGHLIGHT_STYLE}]
+
+
+def read_schedule_from_csv(file_path: str, layout: FestivalLayout = DEFAULT_LAYOUT) -> pd.DataFrame:
     """Read a schedule from a CSV file."""
     schedule_df = pd.read_csv(file_path)
     for col in schedule_df.columns:
         schedule_df[col] = schedule_df[col].apply(Artist.from_str)
 
-    schedule_df.index = HOURS
+    schedule_df.index = layout.index()
     return schedule_df
 
 
@@ -2,8 +2,8 @@ import base64
 import pandas as pd
 from pathlib import Path
 
-from lolla.scheduling.constants import STAGES
 from lolla.scheduling.artists import Artist
+from lolla.scheduling.layout import DEFAULT_LAYOUT, FestivalLayout
 
 
 def get_schedule_background_image_b64() -> str:
@@ -22,12 +22,12 @@ def get_landing_page_background_image_b64() -> str:
     return base64.b64encode(img_bytes).decode()
 
 
-def serialize_schedule_df(schedule_df: pd.DataFrame) -> list[dict]:
+def serialize_schedule_df(schedule_df: pd.DataFrame, layout: FestivalLayout = DEFAULT_LAYOUT) -> list[dict]:
     """Convert DataFrame with Artist objects to serializable format."""
     data = []
     for _, row in schedule_df.iterrows():
         row_data = {}
-        for stage in STAGES:
+        for stage in layout.stages:
             artist = row[stage]
             if isinstance(artist, Artist):
                 row_data[stage] = artist.to_dict()
@@ -37,14 +37,12 @@ def serialize_schedule_df(schedule_df: pd.DataFrame) -> list[dict]:
     return data
 
 
-def deserialize_schedule_df(schedule_data: list[dict]) -> pd.DataFrame:
+def deserialize_schedule_df(schedule_data: list[dict], layout: FestivalLayout = DEFAULT_LAYOUT) -> pd.DataFrame:
     """Convert serializable format back to DataFrame with Artist objects."""
-    from lolla.scheduling.constants import HOURS
-
     rows = []
     for row_data in schedule_data:
         row = {}
-        for stage in STAGES:
+        for stage in layout.stages:
             artist_data = row_data.get(stage)
             if artist_data:
                 row[stage] = Artist.from_dict(artist_data)
@@ -52,6 +50,6 @@ def deserialize_schedule_df(schedule_data: list[dict]) -> pd.DataFrame:
                 row[stage] = None
         rows.append(row)
 
-    schedule_df = pd.DataFrame(rows, columns=STAGES)
-    schedule_df.index = HOURS[: len(schedule_df)]
+    schedule_df = pd.DataFrame(rows, columns=list(layout.stages))
+    schedule_df.index = layout.index()[: len(schedule_df)]
     return schedule_df
\ No newline at end of file
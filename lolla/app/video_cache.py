@@ -0,0 +1,98 @@
+"""A persistent cache of the video found for each artist, so repeated clicks don't spend YouTube API quota.
+
+Lookups are stored in SQLite with the time they were made. A video ID is kept for `ttl` seconds. That no video
+was found is cached too, but for the shorter `negative_ttl`, since a video may turn up later.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Optional, Union
+
+DAY = 24 * 60 * 60
+DEFAULT_CACHE_PATH = Path.home() / ".cache" / "lolla" / "videos.sqlite3"
+
+
+@dataclass(frozen=True)
+class CachedVideo:
+    """The result of looking up an artist's video: its ID, or None if no video was found."""
+    video_id: Optional[str]
+    fetched_at: float
+
+
+class VideoCache:
+    """Artist name to video ID, persisted in a SQLite database."""
+
+    def __init__(
+        self,
+        path: Union[str, Path] = DEFAULT_CACHE_PATH,
+        ttl: float = 30 * DAY,
+        negative_ttl: float = DAY,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.clock = clock
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # One connection shared by Dash's callback threads, with the lock serializing access to it
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS videos (artist TEXT PRIMARY KEY, video_id TEXT, fetched_at REAL NOT NULL)"
+            )
+
+    def get(self, artist_name: str) -> Optional[CachedVideo]:
+        """The cached lookup for an artist, or None if there is none or it has expired."""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT video_id, fetched_at FROM videos WHERE artist = ?", (artist_name,)
+            ).fetchone()
+        if row is None:
+            return None
+        cached = CachedVideo(*row)
+        ttl = self.ttl if cached.video_id is not None else self.negative_ttl
+        if self.clock() - cached.fetched_at > ttl:
+            return None
+        return cached
+
+    def set(self, artist_name: str, video_id: Optional[str]) -> None:
+        """Record the video found for an artist, or None if there was none."""
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO videos (artist, video_id, fetched_at) VALUES (?, ?, ?)",
+                (artist_name, video_id, self.clock()),
+            )
+
+    def get_or_fetch(self, artist_name: str, fetch: Callable[[str], Optional[str]]) -> Optional[str]:
+        """The cached video ID for an artist, fetching (and caching) it if the cache has nothing fresh.
+
+        Errors from `fetch` are not cached, so the next call tries again.
+        """
+        cached = self.get(artist_name)
+        if cached is not None:
+            return cached.video_id
+        video_id = fetch(artist_name)
+        self.set(artist_name, video_id)
+        return video_id
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+_default_cache: Optional[VideoCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_video_cache() -> VideoCache:
+    """The shared cache, stored at LOLLA_VIDEO_CACHE if that's set, or in ~/.cache/lolla otherwise."""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = VideoCache(os.environ.get("LOLLA_VIDEO_CACHE", DEFAULT_CACHE_PATH))
+        return _default_cache
@@ -0,0 +1,73 @@
+"""Video lookups run on a thread pool, so a slow provider never ties up the thread serving a Dash request.
+
+Lookups are single-flight: while one is running for an artist, looking the artist up again joins it rather than
+starting another. The latest lookup of each artist is kept so the app can poll for its result, but a finished
+lookup is never reused: looking the artist up again asks the provider, whose cache (see CachedVideoProvider)
+decides whether its answer is still fresh.
+
+Artists can also be prefetched, e.g. those playing around the highlighted hour, to warm the provider's cache
+before they're clicked. Prefetches run on their own (smaller) pool so they never queue ahead of a click.
+"""
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Iterable, Optional
+
+from lolla.app.video_providers import VideoProvider
+
+
+class VideoLookup:
+    """Looks up artists' videos with a provider, on up to `max_workers` background threads.
+
+    Prefetches get another `prefetch_workers` threads.
+    """
+
+    def __init__(self, provider: VideoProvider, max_workers: int = 4, prefetch_workers: int = 2):
+        self.provider = provider
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix="video-lookup")
+        self._prefetch_executor = ThreadPoolExecutor(prefetch_workers, thread_name_prefix="video-prefetch")
+        # The latest lookup of each artist, running or finished
+        self._lookups: dict[str, Future] = {}
+        # Those of the lookups that are prefetches
+        self._prefetches: set[Future] = set()
+        self._lock = threading.Lock()
+
+    def submit(self, artist_name: str) -> Future:
+        """Start looking up an artist's video, or join the lookup already running for them.
+
+        A prefetch of the artist that is still queued is cancelled and the lookup started right away instead.
+        """
+        with self._lock:
+            lookup = self._lookups.get(artist_name)
+            if _needs_lookup(lookup) or (lookup in self._prefetches and lookup.cancel()):
+                lookup = self._executor.submit(self.provider.find_video_id, artist_name)
+                self._lookups[artist_name] = lookup
+            return lookup
+
+    def prefetch(self, artist_names: Iterable[str]) -> int:
+        """Start looking up any of these artists that aren't being looked up already, returning how many."""
+        num_started = 0
+        with self._lock:
+            for artist_name in artist_names:
+                if not _needs_lookup(self._lookups.get(artist_name)):
+                    continue
+                lookup = self._prefetch_executor.submit(self.provider.find_video_id, artist_name)
+                self._lookups[artist_name] = lookup
+                self._prefetches.add(lookup)
+                lookup.add_done_callback(self._prefetches.discard)
+                num_started += 1
+        return num_started
+
+    def get(self, artist_name: str) -> Optional[Future]:
+        """The latest lookup of an artist, or None if they've never been looked up."""
+        with self._lock:
+            return self._lookups.get(artist_name)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._prefetch_executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _needs_lookup(lookup: Optional[Future]) -> bool:
+    """Whether an artist whose latest lookup is `lookup` has no lookup running for them."""
+    return lookup is None or lookup.done()
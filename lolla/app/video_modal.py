@@ -0,0 +1,168 @@
+"""The modal that pops up over the schedule when an artist is clicked."""
+
+import logging
+from concurrent.futures import Future
+
+import dash_bootstrap_components as dbc
+from dash import html
+
+from lolla.app.youtube import create_youtube_embed
+from lolla.scheduling.artists import Artist
+
+NO_VIDEO_MESSAGE = "Sorry, no video available for this artist."
+LOOKUP_ERROR_MESSAGE = "Unable to load video at this time."
+LOADING_MESSAGE = "Finding a video..."
+
+logger = logging.getLogger(__name__)
+
+
+def lookup_modal(artist: Artist, lookup: Future) -> html.Div:
+    """The modal for a finished video lookup: the video, or a message saying why there isn't one."""
+    try:
+        video_id = lookup.result()
+    except Exception:
+        logger.warning("Video lookup for %s failed", artist.name, exc_info=True)
+        return message_modal(artist, LOOKUP_ERROR_MESSAGE)
+    if video_id:
+        return video_modal(artist, video_id)
+    return message_modal(artist, NO_VIDEO_MESSAGE)
+
+
+def video_modal(artist: Artist, video_id: str) -> html.Div:
+    """A modal playing the artist's video."""
+    return html.Div(
+        [
+            # Modal-style backdrop
+            html.Div(
+                style={
+                    "position": "fixed",
+                    "top": "0",
+                    "left": "0",
+                    "width": "100%",
+                    "height": "100%",
+                    "backgroundColor": "rgba(0,0,0,0.7)",
+                    "zIndex": "1000",
+                    "display": "flex",
+                    "justifyContent": "center",
+                    "alignItems": "center",
+                    "pointerEvents": "all",  # Enable clicks on modal
+                },
+                children=[
+                    html.Div(
+                        [
+                            html.Div(
+                                [
+                                    html.H4(
+                                        f"🎵 Now Playing: {artist.name}",
+                                        style={
+                                            "margin": "0 0 10px 0",
+                                            "color": "#e74c3c",
+                                        },
+                                    ),
+                                    html.P(
+                                        f"{artist.size.name.title()} {artist.genre.name.title()} Artist",
+                                        style={
+                                            "margin": "0 0 15px 0",
+                                            "color": "#666",
+                                        },
+                                    ),
+                                    html.Div(
+                                        [
+                                            dbc.Button(
+                                                "✕ Close",
+                                                id="close-video-btn",
+                                                size="sm",
+                                                color="secondary",
+                                                style={
+                                                    "marginRight": "10px"
+                                                },
+                                            ),
+                                            dbc.Button(
+                                                "🔗 Open in YouTube",
+                                                href=f"https://www.youtube.com/watch?v={video_id}",
+                                                target="_blank",
+                                                size="sm",
+                                                color="info",
+                                                external_link=True,
+                                            ),
+                                        ],
+                                        style={"marginBottom": "15px"},
+                                    ),
+                                ],
+                                style={"textAlign": "center"},
+                            ),
+                            html.Div(
+                                [
+                                    create_youtube_embed(
+                                        video_id, width="640", height="360"
+                                    )
+                                ]
+                            ),
+                        ],
+                        style={
+                            "backgroundColor": "white",
+                            "padding": "20px",
+                            "borderRadius": "15px",
+                            "boxShadow": "0 8px 32px rgba(0,0,0,0.3)",
+                            "maxWidth": "700px",
+                            "maxHeight": "90vh",
+                            "overflow": "auto",
+                        },
+                    )
+                ],
+            )
+        ]
+    )
+
+
+def message_modal(artist: Artist, message: str) -> html.Div:
+    """A modal with a message about the artist's video instead of the video itself, e.g. that there is none."""
+    return html.Div(
+        [
+            html.Div(
+                [
+                    html.H5(
+                        f"🎵 {artist.name}",
+                        style={"color": "#e74c3c", "marginBottom": "10px"},
+                    ),
+                    html.P(
+                        message,
+                        style={
+                            "color": "#666",
+                            "fontStyle": "italic",
+                            "marginBottom": "15px",
+                        },
+                    ),
+                    dbc.Button(
+                        "✕ Close",
+                        id="close-video-btn",
+                        size="sm",
+                        color="secondary",
+                    ),
+                ],
+                style={
+                    "backgroundColor": "white",
+                    "padding": "30px",
+                    "borderRadius": "15px",
+                    "textAlign": "center",
+                    "boxShadow": "0 4px 16px rgba(0,0,0,0.2)",
+                    "margin": "20px auto",
+                    "maxWidth": "400px",
+                    "pointerEvents": "all",  # Enable clicks on the message
+                },
+            )
+        ],
+        style={
+            "position": "fixed",
+            "top": "0",
+            "left": "0",
+            "width": "100%",
+            "height": "100%",
+            "backgroundColor": "rgba(0,0,0,0.5)",
+            "zIndex": "1000",
+            "display": "flex",
+            "justifyContent": "center",
+            "alignItems": "center",
+            "pointerEvents": "all",
+        },
+    )
@@ -0,0 +1,64 @@
+"""Where the app finds the video to play for an artist.
+
+A provider is anything with a `find_video_id(artist_name)` method. The live one searches YouTube (see
+youtube.YouTubeProvider). LocalVideoProvider serves a fixed mapping from a JSON file with an optional
+artificial delay, so the click path can be load-tested and benchmarked offline. CachedVideoProvider puts
+a VideoCache in front of any other provider.
+"""
+
+import json
+import random
+import time
+from pathlib import Path
+from typing import Optional, Protocol, Union
+
+from lolla.app.video_cache import VideoCache, get_video_cache
+
+
+class VideoProvider(Protocol):
+    def find_video_id(self, artist_name: str) -> Optional[str]:
+        """The ID of the video to play for an artist, or None if there is none."""
+        ...
+
+
+class LocalVideoProvider:
+    """Video IDs from a fixed artist name to video ID mapping, after a simulated lookup delay.
+
+    Each lookup sleeps for `latency` seconds plus a uniformly random `jitter` of up to that many seconds.
+    Artists missing from the mapping have no video.
+    """
+
+    def __init__(self, videos: dict[str, Optional[str]], latency: float = 0.0, jitter: float = 0.0):
+        self.videos = dict(videos)
+        self.latency = latency
+        self.jitter = jitter
+
+    @classmethod
+    def from_file(cls, path: Union[str, Path], latency: float = 0.0, jitter: float = 0.0) -> "LocalVideoProvider":
+        """Load the mapping from a JSON object of artist names to video IDs (or null)."""
+        with open(path) as f:
+            return cls(json.load(f), latency, jitter)
+
+    def find_video_id(self, artist_name: str) -> Optional[str]:
+        delay = self.latency + (random.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay > 0:
+            time.sleep(delay)
+        return self.videos.get(artist_name)
+
+
+class CachedVideoProvider:
+    """Another provider behind a VideoCache, which defaults to the shared cache (see get_video_cache)."""
+
+    def __init__(self, provider: VideoProvider, cache: Optional[VideoCache] = None):
+        self.provider = provider
+        self._cache = cache
+
+    @property
+    def cache(self) -> VideoCache:
+        # Opened on first use, so creating an app doesn't touch the cache database until a video is looked up
+        if self._cache is None:
+            self._cache = get_video_cache()
+        return self._cache
+
+    def find_video_id(self, artist_name: str) -> Optional[str]:
+        return self.cache.get_or_fetch(artist_name, self.provider.find_video_id)
@@ -1,64 +1,154 @@
 """Methods that use the YouTube API to find and embed artist top videos."""
 
+import argparse
+import logging
 import os
+import threading
+from typing import Iterable, Optional
+
 import requests
 from dash import html
 
-def get_youtube_video_id(artist_name: str) -> str:
-    """Searches for the most relevant embeddable YouTube video for the given artist."""
-    print(f"Searching for YouTube video for artist: {artist_name}")
-
-    api_key = os.environ.get("YOUTUBE_API_KEY")
-    if not api_key:
-        raise ValueError("Missing YOUTUBE_API_KEY environment variable")
-
-    query = f"{artist_name} band music video"
-    search_url = "https://www.googleapis.com/youtube/v3/search"
-    video_url = "https://www.googleapis.com/youtube/v3/videos"
-
-    search_params = {
-        "part": "snippet",
-        "q": query,
-        "type": "video",
-        "maxResults": 10,
-        "key": api_key,
-        "videoEmbeddable": "true",
-        "videoSyndicated": "true",
-        "safeSearch": "none",
-    }
-
-    response = requests.get(search_url, params=search_params)
-    if response.status_code != 200:
-        raise Exception(f"YouTube API error: {response.status_code}, {response.text}")
-
-    items = response.json().get("items", [])
-    if not items:
-        return None
+from lolla.app.video_cache import VideoCache, get_video_cache
+from lolla.app.video_providers import CachedVideoProvider, VideoProvider
+from lolla.scheduling.artists import Artist, size_to_artist_dict
+from lolla.scheduling.log import set_verbosity
+
+logger = logging.getLogger(__name__)
+
+# (connect, read) timeouts in seconds for every YouTube API request
+REQUEST_TIMEOUT = (3.05, 10)
+
+# One session per thread, so consecutive API calls reuse keep-alive connections without sharing a
+# requests.Session (which isn't thread-safe) between the app's lookup threads
+_thread_local = threading.local()
+
+
+def _thread_session() -> requests.Session:
+    """The calling thread's session, created on its first API call."""
+    session = getattr(_thread_local, "session", None)
+    if session is None:
+        session = _thread_local.session = requests.Session()
+    return session
+
+
+class YouTubeProvider:
+    """Finds the most relevant embeddable video for an artist with the YouTube search API.
+
+    The API key defaults to the YOUTUBE_API_KEY environment variable, read once when the provider is created.
+    By default every thread makes its requests with its own session. A `session` passed in is used from every
+    thread that calls the provider, so it should only be given to a provider that is used from one thread.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        session: Optional[requests.Session] = None,
+        timeout: tuple[float, float] = REQUEST_TIMEOUT,
+    ):
+        self.api_key = api_key if api_key is not None else os.environ.get("YOUTUBE_API_KEY")
+        self.session = session
+        self.timeout = timeout
+
+    def find_video_id(self, artist_name: str) -> Optional[str]:
+        """Searches the YouTube API for the most relevant embeddable video for the given artist."""
+        logger.info("Searching for YouTube video for artist: %s", artist_name)
+
+        if not self.api_key:
+            raise ValueError("Missing YOUTUBE_API_KEY environment variable")
+
+        session = self.session if self.session is not None else _thread_session()
+        query = f"{artist_name} band music video"
+        search_url = "https://www.googleapis.com/youtube/v3/search"
+        video_url = "https://www.googleapis.com/youtube/v3/videos"
+
+        search_params = {
+            "part": "snippet",
+            "q": query,
+            "type": "video",
+            "maxResults": 10,
+            "key": self.api_key,
+            "videoEmbeddable": "true",
+            "videoSyndicated": "true",
+            "safeSearch": "none",
+        }
+
+        response = session.get(search_url, params=search_params, timeout=self.timeout)
+        if response.status_code != 200:
+            raise Exception(f"YouTube API error: {response.status_code}, {response.text}")
 
-    # Exclude live concerts or features
-    exclude_keywords = ["live", "concert", "feat", "ft." "featuring"]
-    items = [
-        item for item in items
-        if not any(keyword in item["snippet"]["title"].lower() for keyword in exclude_keywords)
-    ]
+        items = response.json().get("items", [])
+        if not items:
+            return None
 
-    video_ids = [item["id"]["videoId"] for item in items]
+        # Exclude live concerts or features
+        exclude_keywords = ["live", "concert", "feat", "ft." "featuring"]
+        items = [
+            item for item in items
+            if not any(keyword in item["snippet"]["title"].lower() for keyword in exclude_keywords)
+        ]
 
-    # Check embeddability of each video
-    for video_id in video_ids:
+        video_ids = [item["id"]["videoId"] for item in items]
+        if not video_ids:
+            return None
+
+        # Check embeddability of every video in one request
         detail_params = {
             "part": "status",
-            "id": video_id,
-            "key": api_key,
+            "id": ",".join(video_ids),
+            "key": self.api_key,
+        }
+        detail_response = session.get(video_url, params=detail_params, timeout=self.timeout)
+        if detail_response.status_code != 200:
+            raise Exception(f"YouTube API error: {detail_response.status_code}, {detail_response.text}")
+
+        embeddable = {
+            detail["id"]: detail["status"].get("embeddable", False)
+            for detail in detail_response.json().get("items", [])
         }
-        detail_response = requests.get(video_url, params=detail_params)
-        if detail_response.status_code == 200:
-            details = detail_response.json().get("items", [])
-            if details and details[0]["status"].get("embeddable", False):
+        # The details don't come back in any particular order, so keep the search's order of relevance
+        for video_id in video_ids:
+            if embeddable.get(video_id, False):
                 return video_id
 
-    # No embeddable video found
-    return None
+        # No embeddable video found
+        return None
+
+
+def get_youtube_video_id(artist_name: str, cache: Optional[VideoCache] = None) -> Optional[str]:
+    """The most relevant embeddable YouTube video for the given artist, from the video cache if possible.
+
+    Uses the shared cache (see get_video_cache) unless another one is given.
+    """
+    return CachedVideoProvider(YouTubeProvider(), cache).find_video_id(artist_name)
+
+
+def warm_up_video_cache(
+    artists: Optional[Iterable[Artist]] = None,
+    cache: Optional[VideoCache] = None,
+    refresh: bool = False,
+    provider: Optional[VideoProvider] = None,
+) -> int:
+    """Look up the video of every artist in the catalog (or just `artists`) ahead of time, returning how many were searched.
+
+    Videos come from YouTube unless another provider is given. Artists with a fresh cache entry are
+    skipped unless `refresh` is set, so an interrupted warm-up (e.g. by running out of API quota) picks
+    up where it left off.
+    """
+    if cache is None:
+        cache = get_video_cache()
+    if provider is None:
+        provider = YouTubeProvider()
+    if artists is None:
+        artists = [artist for size_artists in size_to_artist_dict.values() for artist in size_artists]
+
+    num_searched = 0
+    for artist in artists:
+        if not refresh and cache.get(artist.name) is not None:
+            continue
+        cache.set(artist.name, provider.find_video_id(artist.name))
+        num_searched += 1
+    return num_searched
 
 def create_youtube_embed(video_id: str, width: str = "560", height: str = "315") -> html.Iframe:
     """Creates a Dash HTML iframe component for embedding a YouTube video."""
@@ -74,11 +164,18 @@ def create_youtube_embed(video_id: str, width: str = "560", height: str = "315")
     )
 
 if __name__ == "__main__":
-    artist_name = "Charlotte Lawrence"
-    video_id = get_youtube_video_id(artist_name)
-    if video_id:
-        print(f"Video ID for {artist_name}: {video_id}")
-    else:
-        print(f"No video found for {artist_name}")
+    parser = argparse.ArgumentParser(description="Look up artist videos, or fill the video cache for the whole catalog.")
+    parser.add_argument("artist", nargs="?", default="Charlotte Lawrence")
+    parser.add_argument("--warm-up", action="store_true", help="Fill the video cache for every artist in the catalog")
+    parser.add_argument("--refresh", action="store_true", help="With --warm-up, search again for cached artists too")
+    args = parser.parse_args()
 
-    create_youtube_embed(video_id)
\ No newline at end of file
+    set_verbosity(1)
+    if args.warm_up:
+        print(f"Searched for {warm_up_video_cache(refresh=args.refresh)} artists")
+    else:
+        video_id = get_youtube_video_id(args.artist)
+        if video_id:
+            print(f"Video ID for {args.artist}: {video_id}")
+        else:
+            print(f"No video found for {args.artist}")
\ No newline at end of file
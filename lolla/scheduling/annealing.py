@@ -0,0 +1,206 @@
+"""A simulated annealing solver for fixing schedule conflicts.
+
+The cost of a schedule is a weighted count of its constraint violations. Each step swaps a concert from a
+random conflict with a random slot and keeps the swap according to the Metropolis criterion: improvements
+are always kept, and a swap that raises the cost by `delta` is kept with probability exp(-delta / T).
+The temperature T is lowered by a cooling schedule, and when a run cools down without reaching a valid
+schedule the solver reheats from the best schedule seen so far.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import random
+from typing import Optional, Sequence
+
+from lolla.scheduling.conflict_tracker import ConflictTracker
+from lolla.scheduling.generate_schedule import (
+    CanNotConvergeError,
+    StepCallback,
+    swap_conflict_with_random,
+    _swap_concerts,
+)
+from lolla.scheduling.grid import ScheduleGrid
+from lolla.scheduling.instrumentation import SolverStats
+
+logger = logging.getLogger(__name__)
+
+class CoolingSchedule:
+    """Base class for the way the annealing temperature changes from step to step."""
+
+    def __init__(self, initial_temperature: float = 2.0, min_temperature: float = 0.01):
+        self.initial_temperature = initial_temperature
+        self.min_temperature = min_temperature
+        self.temperature = initial_temperature
+
+    def reset(self) -> float:
+        """Reheat to the initial temperature, e.g. at the start of a restart."""
+        self.temperature = self.initial_temperature
+        return self.temperature
+
+    def step(self, accepted: bool) -> float:
+        """Advance by one step given whether the last move was accepted, and return the new temperature."""
+        raise NotImplementedError
+
+    @property
+    def is_frozen(self) -> bool:
+        return self.temperature <= self.min_temperature
+
+
+class GeometricCooling(CoolingSchedule):
+    """Multiply the temperature by a constant factor every step."""
+
+    def __init__(self, initial_temperature: float = 2.0, min_temperature: float = 0.01, alpha: float = 0.998):
+        super().__init__(initial_temperature, min_temperature)
+        self.alpha = alpha
+
+    def step(self, accepted: bool) -> float:
+        self.temperature *= self.alpha
+        return self.temperature
+
+
+class LinearCooling(CoolingSchedule):
+    """Lower the temperature by a constant amount every step, reaching the minimum after `num_steps` steps."""
+
+    def __init__(self, initial_temperature: float = 2.0, min_temperature: float = 0.01, num_steps: int = 2000):
+        super().__init__(initial_temperature, min_temperature)
+        self.decrement = (initial_temperature - min_temperature) / num_steps
+
+    def step(self, accepted: bool) -> float:
+        self.temperature = max(self.temperature - self.decrement, self.min_temperature)
+        return self.temperature
+
+
+class AdaptiveCooling(CoolingSchedule):
+    """Steer the temperature towards a target acceptance rate, measured over a window of steps.
+
+    Cools faster while too many moves are accepted and backs off while too few are.
+    """
+
+    def __init__(
+        self,
+        initial_temperature: float = 2.0,
+        min_temperature: float = 0.01,
+        alpha: float = 0.95,
+        target_acceptance: float = 0.2,
+        window: int = 50,
+    ):
+        super().__init__(initial_temperature, min_temperature)
+        self.alpha = alpha
+        self.target_acceptance = target_acceptance
+        self.window = window
+        self._steps = 0
+        self._accepted = 0
+
+    def reset(self) -> float:
+        self._steps = 0
+        self._accepted = 0
+        return super().reset()
+
+    def step(self, accepted: bool) -> float:
+        self._steps += 1
+        self._accepted += accepted
+        if self._steps < self.window:
+            return self.temperature
+
+        acceptance = self._accepted / self._steps
+        self._steps = 0
+        self._accepted = 0
+        if acceptance > self.target_acceptance:
+            self.temperature *= self.alpha**2
+        else:
+            self.temperature *= self.alpha
+        return self.temperature
+
+
+COOLING_SCHEDULES: dict[str, type[CoolingSchedule]] = {
+    "geometric": GeometricCooling,
+    "linear": LinearCooling,
+    "adaptive": AdaptiveCooling,
+}
+
+
+def anneal_schedule_conflicts(
+    grid: ScheduleGrid,
+    cooling: CoolingSchedule | str = "geometric",
+    weights: Optional[Sequence[float]] = None,
+    max_steps_per_restart: int = 3000,
+    max_restarts: int = 3,
+    rng: random.Random = random,
+    on_step: Optional[StepCallback] = None,
+    stats: Optional[SolverStats] = None,
+) -> ScheduleGrid:
+    """Fix schedule conflicts with simulated annealing, stopping as soon as the cost reaches zero.
+
+    `weights` has one weight per constraint in the order of the constraint registry, and defaults to the
+    weights the constraints were registered with.
+    If given, `on_step(iteration, num_conflicts)` is called after every step, counting across restarts,
+    and `stats` is updated with the iterations, accepted and rejected moves, reheats and conflicts by constraint.
+    Modifies the grid in place and returns it (or a copy of the best schedule found after a restart).
+    Raises CanNotConvergeError if the schedule still has conflicts after every restart.
+    """
+    if isinstance(cooling, str):
+        cooling = COOLING_SCHEDULES[cooling]()
+
+    tracker = ConflictTracker(grid)
+    if weights is None:
+        weights = tracker.default_weights
+    if stats is not None:
+        stats.record_conflicts(tracker.conflict_counts_by_name())
+    cost = tracker.cost(weights)
+    best_grid, best_cost = grid.copy(), cost
+    iteration = 0
+
+    for restart in range(max_restarts + 1):
+        if restart > 0:
+            # Reheat from the best schedule seen so far rather than from wherever the last run froze
+            logger.debug("Reheating from the best schedule so far (cost %s), restart %d", best_cost, restart)
+            grid = best_grid.copy()
+            tracker = ConflictTracker(grid)
+            cost = best_cost
+            if stats is not None:
+                stats.reheats += 1
+        temperature = cooling.reset()
+
+        for _ in range(max_steps_per_restart):
+            if cost == 0:
+                return grid
+
+            conflict = tracker.random_conflict(rng)
+            swapped_concert, original_concert = swap_conflict_with_random(tracker, conflict, rng)
+            new_cost = tracker.cost(weights)
+            delta = new_cost - cost
+
+            # Metropolis acceptance criterion
+            accepted = delta <= 0 or rng.random() < math.exp(-delta / temperature)
+            if accepted:
+                cost = new_cost
+                if cost < best_cost:
+                    best_grid, best_cost = grid.copy(), cost
+            else:
+                _swap_concerts(tracker, swapped_concert, original_concert)
+
+            iteration += 1
+            if stats is not None:
+                stats.iterations += 1
+                stats.accepted_swaps += accepted
+                stats.rejected_swaps += not accepted
+            if on_step is not None:
+                on_step(iteration, tracker.num_conflicts)
+
+            temperature = cooling.step(accepted)
+            if cooling.is_frozen:
+                break
+
+        if cost == 0:
+            return grid
+
+    best_tracker = ConflictTracker(best_grid)
+    if stats is not None:
+        stats.record_conflicts(best_tracker.conflict_counts_by_name(), remaining=True)
+    raise CanNotConvergeError(
+        f"Annealing left {best_cost} weighted conflicts after {max_restarts} restarts.  Trying again.",
+        schedule=best_grid,
+        num_conflicts=best_tracker.num_conflicts,
+    )
@@ -4,6 +4,7 @@ from __future__ import annotations
 from dataclasses import dataclass
 from enum import Enum
 import random
+from typing import Iterable, Optional
 
 import pandas as pd
 
@@ -32,8 +33,9 @@ class Genre(Enum):
     INDIE = 4
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Artist:
+    """An immutable, hashable artist. Artists from the catalog are shared rather than copied (see `interned`)."""
     name: str
     size: ArtistSize
     genre: Genre
@@ -50,6 +52,14 @@ class Artist:
         name, size_str, genre_str = artist_str.split("<br>")
         size = ArtistSize[size_str.split(": ")[1].upper()]
         genre = Genre[genre_str.split(": ")[1].upper()]
+        return cls.interned(name, size, genre)
+
+    @classmethod
+    def interned(cls, name: str, size: ArtistSize, genre: Genre) -> Artist:
+        """Return the catalog's instance of this artist, only creating a new one for artists outside the catalog."""
+        artist = CATALOG.by_name.get(name)
+        if artist is not None and artist.size == size and artist.genre == genre:
+            return artist
         return cls(name=name, size=size, genre=genre)
     
     def to_dict(self) -> dict:
@@ -66,7 +76,7 @@ class Artist:
         """Create Artist from dictionary."""
         if data is None or not isinstance(data, dict) or data.get("_type") != "Artist":
             return None
-        return cls(
+        return cls.interned(
             name=data["name"],
             size=ArtistSize[data["size"]],
             genre=Genre[data["genre"]]
@@ -293,9 +303,65 @@ size_to_artist_dict[ArtistSize.LARGE].extend(
 )
 
 
-def get_random_artist_of_size(size: ArtistSize) -> Artist:
+class ArtistCatalog:
+    """The artists to choose from, bucketed by (size, genre) so that constrained draws don't need rejection sampling."""
+
+    def __init__(self, artists: Iterable[Artist]):
+        self.buckets: dict[tuple[ArtistSize, Genre], tuple[Artist, ...]] = {
+            (size, genre): () for size in ArtistSize for genre in Genre
+        }
+        self.by_name: dict[str, Artist] = {}
+        for artist in artists:
+            self.buckets[artist.size, artist.genre] += (artist,)
+            self.by_name.setdefault(artist.name, artist)
+
+    def sampler(self, rng: random.Random = random) -> ArtistSampler:
+        """Start a new series of draws without replacement."""
+        return ArtistSampler(self, rng)
+
+
+class ArtistSampler:
+    """Draws random artists from a catalog without replacement, keeping count of how many of each genre were drawn."""
+
+    def __init__(self, catalog: ArtistCatalog, rng: random.Random = random):
+        self._rng = rng
+        self._remaining = {bucket: list(artists) for bucket, artists in catalog.buckets.items()}
+        self.count_per_genre = {genre: 0 for genre in Genre}
+
+    def draw(self, size: ArtistSize, max_per_genre: Optional[int] = None) -> Optional[Artist]:
+        """Draw a random artist of the given size that hasn't been drawn yet.
+
+        Genres that have already been drawn `max_per_genre` times are skipped. Every remaining eligible artist is
+        equally likely, and each draw takes constant time (one step per genre).
+        Returns None if no eligible artist is left.
+        """
+        eligible = [
+            self._remaining[size, genre]
+            for genre in Genre
+            if self._remaining[size, genre]
+            and (max_per_genre is None or self.count_per_genre[genre] < max_per_genre)
+        ]
+        if not eligible:
+            return None
+
+        # Pick a bucket in proportion to its size, then an artist within it, so that every artist is equally likely
+        (bucket,) = self._rng.choices(eligible, weights=[len(artists) for artists in eligible])
+        idx = self._rng.randrange(len(bucket))
+        # Swap-remove: move the last artist into the drawn artist's place
+        artist = bucket[idx]
+        bucket[idx] = bucket[-1]
+        bucket.pop()
+
+        self.count_per_genre[artist.genre] += 1
+        return artist
+
+
+CATALOG = ArtistCatalog(artist for artists in size_to_artist_dict.values() for artist in artists)
+
+
+def get_random_artist_of_size(size: ArtistSize, rng: random.Random = random) -> Artist:
     """Return a random Artist instance matching the given size."""
-    return random.choice(size_to_artist_dict[size])
+    return rng.choice(size_to_artist_dict[size])
 
 
 if __name__ == "__main__":
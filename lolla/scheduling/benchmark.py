@@ -0,0 +1,241 @@
+"""Benchmarks for schedule generation and the conflict repair solvers.
+
+Each benchmark runs a number of seeded generations (so results are comparable between commits) and reports the
+distribution of wall times, the number of repair iterations and restarts, and a convergence curve of the mean
+number of conflicts left after each iteration. Results are plain dicts, so they can be saved as JSON and compared
+against a baseline to catch performance regressions:
+
+    python -m lolla.scheduling.benchmark --runs 20 --output results.json
+    python -m lolla.scheduling.benchmark --runs 20 --baseline results.json
+"""
+
+import argparse
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Optional
+
+import numpy as np
+
+from lolla.scheduling.generate_schedule import (
+    CanNotConvergeError,
+    generate_initial_schedule,
+    generate_schedule_with_report,
+    get_solver,
+)
+
+GENERATION_STRATEGIES = ("swap", "anneal", "anneal-linear", "anneal-adaptive", "ilp")
+REPAIR_STRATEGIES = ("swap", "anneal", "anneal-linear", "anneal-adaptive")
+
+
+@dataclass
+class BenchmarkResult:
+    """Summary of `num_runs` seeded runs of one benchmark."""
+    name: str
+    num_runs: int
+    num_failures: int
+    # Wall time percentiles in seconds, plus the mean and max
+    seconds: dict[str, float]
+    # Repair iterations per run: percentiles, mean and max
+    iterations: dict[str, float]
+    # Restarts (attempts after the first) per run: mean and max
+    restarts: dict[str, float]
+    # Mean number of conflicts left after each sampled iteration, as [iteration, conflicts] pairs.
+    # Runs that converged early count as zero conflicts from then on.
+    convergence_curve: list[list[float]] = field(default_factory=list)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def benchmark_generation(strategy: str, num_runs: int = 20, curve_points: int = 50) -> BenchmarkResult:
+    """Run `num_runs` seeded end-to-end generations (as generate_valid_schedule does) with a strategy."""
+    timings, iterations, restarts, curves = [], [], [], []
+    num_failures = 0
+    _warm_up(strategy)
+    for run in range(num_runs):
+        curve = []
+        start = time.perf_counter()
+        report = generate_schedule_with_report(
+            strategy, seed=run, on_step=lambda _, num_conflicts: curve.append(num_conflicts)
+        )
+        timings.append(time.perf_counter() - start)
+
+        num_failures += not report.is_valid
+        iterations.append(len(curve))
+        restarts.append(report.num_attempts - 1)
+        curves.append(curve)
+
+    return _summarize(f"generate/{strategy}", timings, iterations, restarts, curves, num_failures, curve_points)
+
+
+def benchmark_repair(strategy: str, num_runs: int = 20, curve_points: int = 50) -> BenchmarkResult:
+    """Time a repair solver on its own, fixing `num_runs` seeded random (non-constructive) initial schedules.
+
+    A random initial schedule has plenty of conflicts, which exercises the solver far more than a constructive one.
+    Each run is a single attempt, so a run that doesn't converge counts as a failure rather than a restart.
+    """
+    solver = get_solver(strategy)
+    _warm_up(strategy)
+    timings, iterations, curves = [], [], []
+    num_failures = 0
+    for run in range(num_runs):
+        rng = random.Random(run)
+        curve = []
+        grid = generate_initial_schedule(rng, constructive=False)
+        start = time.perf_counter()
+        try:
+            solver(grid, rng=rng, on_step=lambda _, num_conflicts: curve.append(num_conflicts))
+        except CanNotConvergeError:
+            num_failures += 1
+        timings.append(time.perf_counter() - start)
+
+        iterations.append(len(curve))
+        curves.append(curve)
+
+    return _summarize(f"repair/{strategy}", timings, iterations, [0] * num_runs, curves, num_failures, curve_points)
+
+
+def run_benchmarks(
+    generation_strategies: tuple[str, ...] = GENERATION_STRATEGIES,
+    repair_strategies: tuple[str, ...] = REPAIR_STRATEGIES,
+    num_runs: int = 20,
+) -> dict:
+    """Run every benchmark and return the results along with the environment they were measured in."""
+    results = [benchmark_generation(strategy, num_runs) for strategy in generation_strategies]
+    results += [benchmark_repair(strategy, num_runs) for strategy in repair_strategies]
+    return {
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": {result.name: result.to_dict() for result in results},
+    }
+
+
+def find_regressions(baseline: dict, current: dict, tolerance: float = 0.2) -> list[str]:
+    """Compare two run_benchmarks outputs and describe every benchmark that got more than `tolerance` slower.
+
+    Medians and p95s are compared, along with failure counts. Benchmarks missing from either side are skipped.
+    """
+    regressions = []
+    for name, result in current["results"].items():
+        if name not in baseline["results"]:
+            continue
+        old = baseline["results"][name]
+        for stat in ("p50", "p95"):
+            old_seconds, new_seconds = old["seconds"][stat], result["seconds"][stat]
+            if new_seconds > old_seconds * (1 + tolerance):
+                regressions.append(f"{name}: {stat} went from {old_seconds:.4f}s to {new_seconds:.4f}s")
+        if result["num_failures"] > old["num_failures"]:
+            regressions.append(f"{name}: failures went from {old['num_failures']} to {result['num_failures']}")
+    return regressions
+
+
+def print_results(results: dict) -> None:
+    """Print a table of the wall time distribution, iterations and restarts of each benchmark."""
+    print(
+        f"{'benchmark':<28}{'p50 (s)':>10}{'p95 (s)':>10}{'p99 (s)':>10}"
+        f"{'iters p50':>11}{'restarts':>10}{'failures':>10}"
+    )
+    for name, result in results["results"].items():
+        print(
+            f"{name:<28}{result['seconds']['p50']:>10.4f}{result['seconds']['p95']:>10.4f}"
+            f"{result['seconds']['p99']:>10.4f}{result['iterations']['p50']:>11.0f}"
+            f"{result['restarts']['mean']:>10.2f}{result['num_failures']:>10}"
+        )
+
+
+def _warm_up(strategy: str) -> None:
+    """Run one unmeasured generation, so one-off costs like lazy imports don't land in the first measured run."""
+    generate_schedule_with_report(strategy, seed=-1)
+
+
+def _summarize(
+    name: str,
+    timings: list[float],
+    iterations: list[int],
+    restarts: list[int],
+    curves: list[list[int]],
+    num_failures: int,
+    curve_points: int,
+) -> BenchmarkResult:
+    return BenchmarkResult(
+        name=name,
+        num_runs=len(timings),
+        num_failures=num_failures,
+        seconds=_distribution(timings),
+        iterations=_distribution(iterations),
+        restarts={"mean": float(np.mean(restarts)), "max": float(np.max(restarts))},
+        convergence_curve=_mean_curve(curves, curve_points),
+    )
+
+
+def _distribution(values: list[float]) -> dict[str, float]:
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {
+        "p50": float(p50),
+        "p95": float(p95),
+        "p99": float(p99),
+        "mean": float(np.mean(values)),
+        "max": float(np.max(values)),
+    }
+
+
+def _mean_curve(curves: list[list[int]], num_points: int) -> list[list[float]]:
+    """Average the per-run curves (padding finished runs with zeros) at up to `num_points` evenly spaced iterations."""
+    length = max((len(curve) for curve in curves), default=0)
+    if length == 0:
+        return []
+
+    padded = np.zeros((len(curves), length))
+    for i, curve in enumerate(curves):
+        padded[i, : len(curve)] = curve
+    sampled = np.unique(np.linspace(0, length - 1, num=min(num_points, length)).astype(int))
+    mean = padded[:, sampled].mean(axis=0)
+    # Iterations are reported 1-based, matching the solvers' on_step callback
+    return [[int(iteration) + 1, float(conflicts)] for iteration, conflicts in zip(sampled, mean)]
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark schedule generation and the repair solvers.")
+    parser.add_argument("--runs", type=int, default=20, help="Seeded runs per benchmark")
+    parser.add_argument("--strategies", nargs="+", default=list(GENERATION_STRATEGIES))
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", help="Compare against the results in this JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown relative to the baseline")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(
+        generation_strategies=tuple(args.strategies),
+        repair_strategies=tuple(strategy for strategy in args.strategies if strategy in REPAIR_STRATEGIES),
+        num_runs=args.runs,
+    )
+    print_results(results)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = find_regressions(json.load(f), results, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,231 @@
+"""Incremental bookkeeping of the conflicts in a schedule as concerts are swapped around.
+
+Rather than rescanning the whole grid after every swap, the tracker keeps the set of current violations and
+only re-evaluates the slots a swap can affect: the hour before and after on the same stage, the paired
+neighbor stage, and (when a stage's count for the day crosses the minimum) the free slots of that stage on that day.
+Swaps never change which artists are booked, so whether an artist is booked more than once just moves with the swap.
+Custom constraints from the registry don't declare which slots a swap can affect, so their masks are
+recomputed in full after every swap.
+"""
+
+import random
+from collections import Counter
+from typing import Callable, Optional, Sequence
+
+import numpy as np
+
+from lolla.scheduling.constraints import (
+    artist_key_values,
+    compile_rules,
+    get_conflict_masks,
+    get_constraints,
+    is_artist_booked_more_than_once,
+    is_neighbor_booked_simultaneously,
+    is_size_window_violated,
+    is_slot_free_and_not_enough_performances_today,
+    is_stage_booked_consecutively,
+)
+from lolla.scheduling.grid import ScheduleGrid
+from lolla.scheduling.wrappers import ScheduleConflict
+
+# A violation is (constraint index, hour index, stage index)
+Violation = tuple[int, int, int]
+
+
+class ConflictTracker:
+    """Keeps the set of violations in a ScheduleGrid up to date as slots are swapped through it."""
+
+    def __init__(self, grid: ScheduleGrid):
+        self.grid = grid
+        self._constraints = get_constraints()
+        self._rules = compile_rules(grid)
+        self._sizes = grid.size_values()
+        self._hours_per_day = self._rules.hours_per_day
+        # Number of concerts on each stage per day, indexed by (day index, stage index)
+        self._stage_counts = np.count_nonzero(
+            self._sizes.reshape(self._rules.num_days, self._hours_per_day, -1), axis=1
+        )
+
+        # Indexed by artist ID (with a trailing False that EMPTY indexes): whether the artist is booked more than once
+        artist_keys = artist_key_values(grid)
+        booked = artist_keys >= 0
+        repeated_keys = np.bincount(artist_keys[booked]) > 1
+        self._repeated_ids = np.zeros(len(grid.artists) + 1, dtype=bool)
+        self._repeated_ids[grid.cells[booked]] = repeated_keys[artist_keys[booked]]
+
+        # The built-in constraints are re-evaluated one slot at a time; any others are recomputed in full
+        self._slot_checks: list[Optional[Callable[[int, int], bool]]] = []
+        self._stage_minimum_idx = None
+        builtin_checks = {
+            is_stage_booked_consecutively: self._is_stage_booked_consecutively,
+            is_neighbor_booked_simultaneously: self._is_neighbor_booked_simultaneously,
+            is_slot_free_and_not_enough_performances_today: self._is_slot_free_and_not_enough_performances_today,
+            is_size_window_violated: self._is_size_window_violated,
+            is_artist_booked_more_than_once: self._is_artist_booked_more_than_once,
+        }
+        for idx, constraint in enumerate(self._constraints):
+            self._slot_checks.append(builtin_checks.get(constraint.predicate))
+            if constraint.predicate is is_slot_free_and_not_enough_performances_today:
+                self._stage_minimum_idx = idx
+        self._custom_indices = [idx for idx, check in enumerate(self._slot_checks) if check is None]
+
+        self._masks = np.stack(get_conflict_masks(grid).as_tuple())
+        self._counts_by_constraint = np.count_nonzero(self._masks, axis=(1, 2))
+
+        # Violations are kept in a list plus a position index so that adding, removing
+        # and sampling a random violation are all constant-time
+        self._violations: list[Violation] = [
+            (int(constraint_idx), int(hour_idx), int(stage_idx))
+            for constraint_idx, hour_idx, stage_idx in zip(*np.nonzero(self._masks))
+        ]
+        self._violation_positions = {violation: i for i, violation in enumerate(self._violations)}
+
+    @property
+    def num_conflicts(self) -> int:
+        return len(self._violations)
+
+    @property
+    def violations(self) -> list[Violation]:
+        return self._violations
+
+    @property
+    def conflict_counts(self) -> np.ndarray:
+        """Number of violations of each constraint, in the order of the constraint registry."""
+        return self._counts_by_constraint
+
+    @property
+    def constraint_names(self) -> tuple[str, ...]:
+        return tuple(constraint.name for constraint in self._constraints)
+
+    def conflict_counts_by_name(self) -> Counter:
+        """Number of violations of each constraint, keyed by constraint name."""
+        return Counter(dict(zip(self.constraint_names, self._counts_by_constraint.tolist())))
+
+    @property
+    def default_weights(self) -> tuple[float, ...]:
+        """The registered weight of each tracked constraint."""
+        return tuple(constraint.weight for constraint in self._constraints)
+
+    def cost(self, weights: Sequence[float]) -> float:
+        """Weighted count of violations, with one weight per constraint in the order of the constraint registry."""
+        return float(np.dot(weights, self._counts_by_constraint))
+
+    def has_conflict_at(self, hour_idx: int, stage_idx: int) -> bool:
+        return bool(self._masks[:, hour_idx, stage_idx].any())
+
+    def first_conflict(self) -> Optional[ScheduleConflict]:
+        """Return one of the current conflicts (arbitrary order), or None if there are none."""
+        if not self._violations:
+            return
+        return self._to_conflict(self._violations[0])
+
+    def random_conflict(self, rng: random.Random = random) -> Optional[ScheduleConflict]:
+        """Return a uniformly random current conflict, or None if there are none."""
+        if not self._violations:
+            return
+        return self._to_conflict(self._violations[rng.randrange(len(self._violations))])
+
+    def swap(self, hour_idx1: int, stage_idx1: int, hour_idx2: int, stage_idx2: int) -> int:
+        """Swap two slots of the grid and return the change in the number of conflicts."""
+        num_before = len(self._violations)
+
+        self.grid.swap(hour_idx1, stage_idx1, hour_idx2, stage_idx2)
+        sizes = self._sizes
+        size1, size2 = sizes[hour_idx1, stage_idx1], sizes[hour_idx2, stage_idx2]
+        sizes[hour_idx1, stage_idx1], sizes[hour_idx2, stage_idx2] = size2, size1
+
+        day_idx1, day_idx2 = hour_idx1 // self._hours_per_day, hour_idx2 // self._hours_per_day
+        if (day_idx1, stage_idx1) != (day_idx2, stage_idx2) and bool(size1) != bool(size2):
+            # A concert moved from one stage (or day) to another
+            moved_to, moved_from = (
+                ((day_idx2, stage_idx2), (day_idx1, stage_idx1)) if size1 else ((day_idx1, stage_idx1), (day_idx2, stage_idx2))
+            )
+            min_artists = self._rules.min_artists_per_stage
+            for (day_idx, stage_idx), change in ((moved_to, 1), (moved_from, -1)):
+                was_understaffed = self._stage_counts[day_idx, stage_idx] < min_artists
+                self._stage_counts[day_idx, stage_idx] += change
+                is_understaffed = self._stage_counts[day_idx, stage_idx] < min_artists
+                if was_understaffed != is_understaffed:
+                    self._refresh_stage_minimum(day_idx, stage_idx)
+
+        neighbors = self._rules.neighbor_indices
+        for hour_idx, stage_idx in ((hour_idx1, stage_idx1), (hour_idx2, stage_idx2)):
+            self._refresh_slot(hour_idx, stage_idx)
+            if hour_idx > 0:
+                self._refresh_slot(hour_idx - 1, stage_idx)
+            neighbor_idx = neighbors[stage_idx]
+            if neighbor_idx >= 0:
+                self._refresh_slot(hour_idx, int(neighbor_idx))
+
+        for constraint_idx in self._custom_indices:
+            new_mask = self._constraints[constraint_idx].mask(self.grid, self._rules)
+            for hour_idx, stage_idx in zip(*np.nonzero(new_mask != self._masks[constraint_idx])):
+                self._set(constraint_idx, int(hour_idx), int(stage_idx), bool(new_mask[hour_idx, stage_idx]))
+
+        return len(self._violations) - num_before
+
+    def _is_stage_booked_consecutively(self, hour_idx: int, stage_idx: int) -> bool:
+        sizes = self._sizes
+        return (
+            self._rules.no_back_to_back
+            and not self._rules.last_hour_of_day[hour_idx]
+            and bool(sizes[hour_idx, stage_idx])
+            and bool(sizes[hour_idx + 1, stage_idx])
+        )
+
+    def _is_neighbor_booked_simultaneously(self, hour_idx: int, stage_idx: int) -> bool:
+        neighbor_idx = self._rules.neighbor_indices[stage_idx]
+        return neighbor_idx >= 0 and bool(self._sizes[hour_idx, stage_idx]) and bool(self._sizes[hour_idx, neighbor_idx])
+
+    def _is_slot_free_and_not_enough_performances_today(self, hour_idx: int, stage_idx: int) -> bool:
+        day_idx = hour_idx // self._hours_per_day
+        return (
+            not self._sizes[hour_idx, stage_idx]
+            and self._stage_counts[day_idx, stage_idx] < self._rules.min_artists_per_stage
+        )
+
+    def _is_size_window_violated(self, hour_idx: int, stage_idx: int) -> bool:
+        return not self._rules.allowed_sizes[hour_idx, self._sizes[hour_idx, stage_idx]]
+
+    def _is_artist_booked_more_than_once(self, hour_idx: int, stage_idx: int) -> bool:
+        return bool(self._repeated_ids[self.grid.cells[hour_idx, stage_idx]])
+
+    def _refresh_slot(self, hour_idx: int, stage_idx: int) -> None:
+        for constraint_idx, check in enumerate(self._slot_checks):
+            if check is not None:
+                self._set(constraint_idx, hour_idx, stage_idx, check(hour_idx, stage_idx))
+
+    def _refresh_stage_minimum(self, day_idx: int, stage_idx: int) -> None:
+        if self._stage_minimum_idx is None:
+            return
+        day_start = day_idx * self._hours_per_day
+        for hour_idx in range(day_start, day_start + self._hours_per_day):
+            self._set(
+                self._stage_minimum_idx,
+                hour_idx,
+                stage_idx,
+                self._is_slot_free_and_not_enough_performances_today(hour_idx, stage_idx),
+            )
+
+    def _to_conflict(self, violation: Violation) -> ScheduleConflict:
+        constraint_idx, hour_idx, stage_idx = violation
+        return self._constraints[constraint_idx].predicate(self.grid, stage_idx, hour_idx)
+
+    def _set(self, constraint_idx: int, hour_idx: int, stage_idx: int, violated: bool) -> None:
+        if self._masks[constraint_idx, hour_idx, stage_idx] == violated:
+            return
+        self._masks[constraint_idx, hour_idx, stage_idx] = violated
+
+        violation = (constraint_idx, hour_idx, stage_idx)
+        if violated:
+            self._counts_by_constraint[constraint_idx] += 1
+            self._violation_positions[violation] = len(self._violations)
+            self._violations.append(violation)
+        else:
+            self._counts_by_constraint[constraint_idx] -= 1
+            # Swap-remove: move the last violation into the freed position
+            position = self._violation_positions.pop(violation)
+            last = self._violations.pop()
+            if last != violation:
+                self._violations[position] = last
+                self._violation_positions[last] = position
@@ -1,130 +1,396 @@
-"""Constraints on the schedule that must be satisfied."""
+"""Constraints on the schedule that must be satisfied.
 
-from typing import Optional
+Every constraint is declared once in a registry (see register_constraint), with a scalar predicate that
+describes the conflict in a single slot and a vectorized mask that finds every violating slot at once.
+The data the built-in constraints need (neighboring stages, size windows by hour, the per-stage minimum)
+is declared in FestivalRules and compiled into lookup tables once per festival layout rather than on every call.
+Rules about a single day (no back-to-back concerts, the per-stage minimum) apply to each day of a multi-day
+festival separately, while an artist can only be booked once over the whole festival.
+"""
 
-import pandas as pd
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Callable, Optional
 
-from collections import defaultdict
+import numpy as np
+
+from lolla.scheduling.grid import ScheduleGrid, EMPTY
+from lolla.scheduling.layout import FestivalLayout
 from lolla.scheduling.wrappers import ScheduleConflict, Concert, ArtistSize
 from lolla.scheduling import params
 
 
+# Represents stages that can't play at the same time
+NEIGHBOR_PAIRS = (
+    ("Bud Light", "Tito's"),
+    ("IHG", "T-Mobile"),
+)
+
+# map hour -> allowed artist sizes
+ALLOWED_SIZES = {
+    # 12–2 PM only small
+    **{h: {ArtistSize.SMALL} for h in range(12, 14)},
+    # 2–5 PM: small or medium
+    **{h: {ArtistSize.SMALL, ArtistSize.MEDIUM} for h in range(14, 17)},
+    # 5–7 PM: any size
+    **{h: {ArtistSize.SMALL, ArtistSize.MEDIUM, ArtistSize.LARGE} for h in range(17, 20)},
+    # 7 - 9 PM medium or large
+    **{h: {ArtistSize.MEDIUM, ArtistSize.LARGE} for h in range(20, 22)},
+    # 9 - 11 PM: large only
+    **{h: {ArtistSize.LARGE} for h in range(22, 23)},
+}
+
+
+@dataclass(frozen=True)
+class FestivalRules:
+    """Declarative description of the built-in scheduling rules."""
+    # Pairs of stages that can't play at the same time
+    neighbor_pairs: tuple[tuple[str, str], ...] = NEIGHBOR_PAIRS
+    # (hour, allowed artist sizes) for every hour of the day
+    size_windows: tuple[tuple[int, frozenset[ArtistSize]], ...] = tuple(
+        (hour, frozenset(sizes)) for hour, sizes in ALLOWED_SIZES.items()
+    )
+    min_artists_per_stage: int = params.MIN_ARTISTS_PER_STAGE_PER_DAY
+    no_back_to_back: bool = True
+
+    def allowed_sizes(self, hour: int) -> frozenset[ArtistSize]:
+        """The sizes allowed at an hour of the day. Hours without a size window allow any size."""
+        return dict(self.size_windows).get(hour, frozenset(ArtistSize))
+
+
+@dataclass(frozen=True)
+class CompiledRules:
+    """FestivalRules turned into lookup tables for a specific festival layout."""
+    rules: FestivalRules
+    layout: FestivalLayout
+    # For each stage, the index of the stage it can't play at the same time as (or -1 if there is none)
+    neighbor_indices: np.ndarray = field(repr=False)
+    # Indexed by (row, ArtistSize value); column 0 stands for a free slot, which is always allowed
+    allowed_sizes: np.ndarray = field(repr=False)
+    # True for the rows that end a day, which have no next hour to be booked back-to-back with
+    last_hour_of_day: np.ndarray = field(repr=False)
+
+    @property
+    def hours_per_day(self) -> int:
+        return self.layout.hours_per_day
+
+    @property
+    def num_days(self) -> int:
+        return self.layout.num_days
+
+    @property
+    def min_artists_per_stage(self) -> int:
+        return self.rules.min_artists_per_stage
+
+    @property
+    def no_back_to_back(self) -> bool:
+        return self.rules.no_back_to_back
+
+
+_active_rules = FestivalRules()
+
+
+def get_rules() -> FestivalRules:
+    """The rules the constraints are currently checked against."""
+    return _active_rules
+
+
+def set_rules(rules: FestivalRules) -> None:
+    """Change the rules the constraints are checked against.
+
+    Lookup tables are compiled (and cached) for the new rules the next time they are needed.
+    """
+    global _active_rules
+    _active_rules = rules
+
+
+def compile_rules(grid: ScheduleGrid) -> CompiledRules:
+    """The lookup tables for the active rules and the grid's festival layout."""
+    return _compile_rules(_active_rules, grid.layout)
+
+
+@lru_cache(maxsize=64)
+def _compile_rules(rules: FestivalRules, layout: FestivalLayout) -> CompiledRules:
+    stages = layout.stages
+
+    stage_index = {stage: i for i, stage in enumerate(stages)}
+    neighbor_indices = np.full(len(stages), -1, dtype=np.intp)
+    for stage1, stage2 in rules.neighbor_pairs:
+        if stage1 in stage_index and stage2 in stage_index:
+            neighbor_indices[stage_index[stage1]] = stage_index[stage2]
+            neighbor_indices[stage_index[stage2]] = stage_index[stage1]
+
+    # Every day has the same size windows, so the table for one day is repeated for each day
+    day_sizes = np.zeros((layout.hours_per_day, max(size.value for size in ArtistSize) + 1), dtype=bool)
+    day_sizes[:, 0] = True
+    for hour_idx, hour in enumerate(layout.hours):
+        for size in rules.allowed_sizes(hour):
+            day_sizes[hour_idx, size.value] = True
+    allowed_sizes = np.tile(day_sizes, (layout.num_days, 1))
+
+    last_hour_of_day = np.zeros(layout.num_rows, dtype=bool)
+    last_hour_of_day[layout.hours_per_day - 1 :: layout.hours_per_day] = True
+
+    # The tables are shared between every caller, so guard them against accidental modification
+    neighbor_indices.flags.writeable = False
+    allowed_sizes.flags.writeable = False
+    last_hour_of_day.flags.writeable = False
+    return CompiledRules(rules, layout, neighbor_indices, allowed_sizes, last_hour_of_day)
+
+
+@dataclass(frozen=True)
+class Constraint:
+    """A rule that every slot of the schedule must satisfy.
+
+    `predicate(grid, stage_idx, hour_idx)` returns the ScheduleConflict in that slot (or None), and
+    `mask(grid, compiled_rules)` returns a boolean (hour, stage) array flagging the same slots for the whole grid.
+    `weight` is how much a violation counts towards the cost minimized by the annealing solver.
+    """
+    name: str
+    predicate: Callable[[ScheduleGrid, int, int], Optional[ScheduleConflict]]
+    mask: Callable[[ScheduleGrid, CompiledRules], np.ndarray]
+    weight: float = 1.0
+
+
+_registry: dict[str, Constraint] = {}
+
+
+def register_constraint(constraint: Constraint) -> Constraint:
+    """Add a constraint to the registry, replacing any constraint with the same name in place."""
+    _registry[constraint.name] = constraint
+    return constraint
+
+
+def unregister_constraint(name: str) -> None:
+    del _registry[name]
+
+
+def get_constraints() -> tuple[Constraint, ...]:
+    """The registered constraints, in the order conflicts are checked and reported in."""
+    return tuple(_registry.values())
+
+
+@dataclass
+class ConflictMasks:
+    """Boolean (hour, stage) masks marking every slot that violates each registered constraint.
+
+    Each mask flags the same slots as the scalar predicate of the same constraint would.
+    """
+    names: tuple[str, ...]
+    masks: tuple[np.ndarray, ...]
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.masks[self.names.index(name)]
+
+    def as_tuple(self) -> tuple[np.ndarray, ...]:
+        """The masks in the same order as the registered constraints."""
+        return self.masks
+
+    def any(self) -> np.ndarray:
+        """Mask of slots with at least one conflict."""
+        return np.logical_or.reduce(self.masks)
+
+    def count(self) -> int:
+        """Total number of violations, counting each (slot, constraint) pair once."""
+        return int(sum(np.count_nonzero(mask) for mask in self.masks))
+
+
+def get_conflict_masks(grid: ScheduleGrid) -> ConflictMasks:
+    """Checks every slot of the schedule against every constraint at once using array operations."""
+    rules = compile_rules(grid)
+    constraints = get_constraints()
+    return ConflictMasks(
+        names=tuple(constraint.name for constraint in constraints),
+        masks=tuple(constraint.mask(grid, rules) for constraint in constraints),
+    )
+
+
+def get_all_schedule_conflicts(grid: ScheduleGrid) -> list[ScheduleConflict]:
+    """Returns every ScheduleConflict in the schedule (one per violating slot and constraint)."""
+    conflicts = []
+    for constraint, mask in zip(get_constraints(), get_conflict_masks(grid).as_tuple()):
+        for hour_idx, stage_idx in zip(*np.nonzero(mask)):
+            conflicts.append(constraint.predicate(grid, int(stage_idx), int(hour_idx)))
+    return conflicts
+
+
 def get_first_schedule_conflict(
-    schedule_df: pd.DataFrame,
+    grid: ScheduleGrid,
 ) -> Optional[ScheduleConflict]:
     """Returns the first ScheduleConflict (arbitrary order), or None if no conflicts are found."""
-    for stage in schedule_df.columns:
-        for hour in schedule_df.index:
-            conflict = check_for_conflicts(schedule_df, stage, hour)
-            if conflict is not None:
-                return conflict
+    # Transpose so that the scan order is stage-major, like checking one stage at a time
+    conflicting = get_conflict_masks(grid).any().T
+    flat_idx = np.argmax(conflicting)
+    if not conflicting.flat[flat_idx]:
+        return
+
+    stage_idx, hour_idx = divmod(int(flat_idx), grid.num_hours)
+    return check_for_conflicts(grid, stage_idx, hour_idx)
 
 
 def check_for_conflicts(
-    schedule_df: pd.DataFrame, stage: str, hour: int
+    grid: ScheduleGrid, stage_idx: int, hour_idx: int
 ) -> Optional[ScheduleConflict]:
-    """Checks for conflicts in the schedule for a given stage and hour."""
-    conflict_predicates = (
-        is_stage_booked_consecutively,
-        is_neighbor_booked_simultaneously,
-        is_slot_free_and_not_enough_performances_today,
-        is_size_window_violated,
-    )
-    for pred in conflict_predicates:
-        conflict = pred(schedule_df, stage, hour)
+    """Checks for conflicts in the schedule for a given stage and hour (both as grid indices)."""
+    for constraint in get_constraints():
+        conflict = constraint.predicate(grid, stage_idx, hour_idx)
         if conflict is not None:
             return conflict
 
 
 def is_stage_booked_consecutively(
-    schedule_df: pd.DataFrame,
-    stage: str,
-    hour: int,
+    grid: ScheduleGrid,
+    stage_idx: int,
+    hour_idx: int,
 ) -> Optional[ScheduleConflict]:
-    if hour == schedule_df.index[-1]:
+    rules = compile_rules(grid)
+    if rules.last_hour_of_day[hour_idx] or not rules.no_back_to_back:
         return
 
-    this_hour_artist = schedule_df.loc[hour, stage]
-    next_hour_artist = schedule_df.loc[hour + 1, stage]
-    if not pd.isna(this_hour_artist) and not pd.isna(next_hour_artist):
-        this_concert = Concert(artist=this_hour_artist, stage=stage, hour=hour)
-        next_concert = Concert(artist=next_hour_artist, stage=stage, hour=hour + 1)
+    if grid.is_booked(hour_idx, stage_idx) and grid.is_booked(hour_idx + 1, stage_idx):
+        this_concert = grid.concert_at(hour_idx, stage_idx)
+        next_concert = grid.concert_at(hour_idx + 1, stage_idx)
         return ScheduleConflict(this_concert, next_concert)
 
 
 def is_neighbor_booked_simultaneously(
-    schedule_df: pd.DataFrame, stage: str, hour: int
+    grid: ScheduleGrid, stage_idx: int, hour_idx: int
 ) -> Optional[ScheduleConflict]:
     """Checks if a stage and its neighbor are booked at the same time.
-    
+
     Only certain stages have neighbors, so this is a sparse check.
     """
-    # Represents stages that can't play at the same time
-    NEIGHBORS = defaultdict(lambda: None, {
-        "Bud Light": "Tito's",
-        "IHG": "T-Mobile",
-    })
-
-    # Add the reverse mapping and map stages without neighbords to None
-    NEIGHBORS |= {v: k for k, v in NEIGHBORS.items()}
-
-    this_hour_artist = schedule_df.loc[hour, stage]
-    if pd.isna(this_hour_artist) or not NEIGHBORS[stage]:
+    neighbor_idx = compile_rules(grid).neighbor_indices[stage_idx]
+    if not grid.is_booked(hour_idx, stage_idx) or neighbor_idx < 0:
         return
 
-    neighboring_artist = schedule_df.loc[hour, NEIGHBORS[stage]]
-    if not pd.isna(neighboring_artist):
+    if grid.is_booked(hour_idx, neighbor_idx):
         return ScheduleConflict(
-            concert1=Concert(artist=this_hour_artist, stage=stage, hour=hour),
-            concert2=Concert(
-                artist=neighboring_artist, stage=NEIGHBORS[stage], hour=hour
-            ),
+            concert1=grid.concert_at(hour_idx, stage_idx),
+            concert2=grid.concert_at(hour_idx, int(neighbor_idx)),
         )
 
 
 def is_slot_free_and_not_enough_performances_today(
-    schedule_df: pd.DataFrame, stage: str, hour: int
+    grid: ScheduleGrid, stage_idx: int, hour_idx: int
 ) -> Optional[ScheduleConflict]:
     """If a stage has less than 3 performances in a day, consider an empty slot a conflict."""
-    this_hour_artist = schedule_df.loc[hour, stage]
-    if not pd.isna(this_hour_artist):
+    if grid.is_booked(hour_idx, stage_idx):
         return
 
-    this_stage_artist_count = schedule_df[stage].count()
-    if this_stage_artist_count < params.MIN_ARTISTS_PER_STAGE_PER_DAY:
+    rules = compile_rules(grid)
+    day_start = hour_idx - hour_idx % rules.hours_per_day
+    this_stage_artist_count = (grid.cells[day_start : day_start + rules.hours_per_day, stage_idx] != EMPTY).sum()
+    if this_stage_artist_count < rules.min_artists_per_stage:
+        empty_concert = grid.concert_at(hour_idx, stage_idx)
         return ScheduleConflict(
-            concert1=Concert(this_hour_artist, stage, hour),
-            concert2=Concert(this_hour_artist, stage, hour),
+            concert1=empty_concert,
+            concert2=empty_concert,
         )
 
 
 def is_size_window_violated(
-    schedule_df: pd.DataFrame, stage: str, hour: int
+    grid: ScheduleGrid, stage_idx: int, hour_idx: int
 ) -> Optional[ScheduleConflict]:
     """A basic constraint that checks if the artist size is allowed at this hour.
-    
+
     This is used to enforce that artists gradually get bigger as the day goes on.
     """
-    # map hour -> allowed artist sizes
-    ALLOWED_SIZES = {
-        # 12–2 PM only small
-        **{h: {ArtistSize.SMALL} for h in range(12, 14)},
-        # 2–5 PM: small or medium
-        **{h: {ArtistSize.SMALL, ArtistSize.MEDIUM} for h in range(14, 17)},
-        # 5–7 PM: any size
-        **{h: {ArtistSize.SMALL, ArtistSize.MEDIUM, ArtistSize.LARGE} for h in range(17, 20)},
-        # 7 - 9 PM medium or large
-        **{h: {ArtistSize.MEDIUM, ArtistSize.LARGE} for h in range(20, 22)},
-        # 9 - 11 PM: large only
-        **{h: {ArtistSize.LARGE} for h in range(22, 23)},
-    }
-
-    scheduled_artist = schedule_df.loc[hour, stage]
-    if pd.isna(scheduled_artist):
+    scheduled_artist = grid.artist_at(hour_idx, stage_idx)
+    if scheduled_artist is None:
         return
 
-    if scheduled_artist.size not in ALLOWED_SIZES[hour]:
+    if not compile_rules(grid).allowed_sizes[hour_idx, scheduled_artist.size.value]:
+        concert = grid.concert_at(hour_idx, stage_idx)
+        return ScheduleConflict(concert, concert)
+
+
+def is_artist_booked_more_than_once(
+    grid: ScheduleGrid, stage_idx: int, hour_idx: int
+) -> Optional[ScheduleConflict]:
+    """Checks if the artist in this slot also plays another slot, on any day of the festival."""
+    if not grid.is_booked(hour_idx, stage_idx):
+        return
+
+    artist_keys = artist_key_values(grid)
+    same_artist = artist_keys == artist_keys[hour_idx, stage_idx]
+    same_artist[hour_idx, stage_idx] = False
+    if same_artist.any():
+        other_hour_idx, other_stage_idx = np.argwhere(same_artist)[0]
         return ScheduleConflict(
-            Concert(scheduled_artist, stage, hour),
-            Concert(scheduled_artist, stage, hour),
+            concert1=grid.concert_at(hour_idx, stage_idx),
+            concert2=grid.concert_at(int(other_hour_idx), int(other_stage_idx)),
         )
+
+
+def artist_key_values(grid: ScheduleGrid) -> np.ndarray:
+    """Array with the same integer in every slot booked by the same artist (by name), and -1 in free slots.
+
+    The side table can hold the same artist more than once, so slots are compared by artist name rather than ID.
+    """
+    keys: dict[str, int] = {}
+    # The trailing -1 is what EMPTY (-1) indexes
+    key_by_id = np.array([keys.setdefault(artist.name, len(keys)) for artist in grid.artists] + [-1], dtype=np.intp)
+    return key_by_id[grid.cells]
+
+
+def _stage_booked_consecutively_mask(grid: ScheduleGrid, rules: CompiledRules) -> np.ndarray:
+    booked = grid.booked_mask()
+    consecutive = np.zeros_like(booked)
+    if rules.no_back_to_back:
+        consecutive[:-1] = booked[:-1] & booked[1:]
+        # The last hour of one day and the first hour of the next aren't back-to-back
+        consecutive[rules.last_hour_of_day] = False
+    return consecutive
+
+
+def _neighbor_booked_simultaneously_mask(grid: ScheduleGrid, rules: CompiledRules) -> np.ndarray:
+    booked = grid.booked_mask()
+    neighbor = np.zeros_like(booked)
+    has_neighbor = rules.neighbor_indices >= 0
+    neighbor[:, has_neighbor] = booked[:, has_neighbor] & booked[:, rules.neighbor_indices[has_neighbor]]
+    return neighbor
+
+
+def _slot_free_and_not_enough_performances_today_mask(grid: ScheduleGrid, rules: CompiledRules) -> np.ndarray:
+    booked = grid.booked_mask()
+    counts_per_day = booked.reshape(rules.num_days, rules.hours_per_day, -1).sum(axis=1)
+    understaffed_stages = np.repeat(counts_per_day < rules.min_artists_per_stage, rules.hours_per_day, axis=0)
+    return ~booked & understaffed_stages
+
+
+def _size_window_violated_mask(grid: ScheduleGrid, rules: CompiledRules) -> np.ndarray:
+    return ~rules.allowed_sizes[np.arange(grid.num_hours)[:, np.newaxis], grid.size_values()]
+
+
+def _artist_booked_more_than_once_mask(grid: ScheduleGrid, rules: CompiledRules) -> np.ndarray:
+    artist_keys = artist_key_values(grid)
+    booked = artist_keys >= 0
+    repeated = np.zeros_like(booked)
+    repeated[booked] = np.bincount(artist_keys[booked])[artist_keys[booked]] > 1
+    return repeated
+
+
+# The built-in constraints. Registration order is the order conflicts are checked and reported in.
+register_constraint(
+    Constraint("stage_booked_consecutively", is_stage_booked_consecutively, _stage_booked_consecutively_mask)
+)
+register_constraint(
+    Constraint(
+        "neighbor_booked_simultaneously", is_neighbor_booked_simultaneously, _neighbor_booked_simultaneously_mask
+    )
+)
+register_constraint(
+    Constraint(
+        "slot_free_and_not_enough_performances_today",
+        is_slot_free_and_not_enough_performances_today,
+        _slot_free_and_not_enough_performances_today_mask,
+        # Every free slot on an understaffed stage counts as a violation, so this is weighted down
+        # to keep a single missing concert from dominating the annealing cost
+        weight=0.25,
+    )
+)
+register_constraint(Constraint("size_window_violated", is_size_window_violated, _size_window_violated_mask))
+register_constraint(
+    Constraint("artist_booked_more_than_once", is_artist_booked_more_than_once, _artist_booked_more_than_once_mask)
+)
@@ -1,161 +1,419 @@
+import logging
 import random
+import time
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Callable, Optional
 
-import pandera as pa
 import pandas as pd
 
-from lolla.scheduling.constants import (
-    STAGES,
-    HOURS,
-)
 from lolla.scheduling.constraints import (
-    get_first_schedule_conflict,
     ScheduleConflict,
     Concert,
-    check_for_conflicts,
+    get_conflict_masks,
 )
+from lolla.scheduling.conflict_tracker import ConflictTracker
+from lolla.scheduling.grid import ScheduleGrid
+from lolla.scheduling.instrumentation import SolverStats, phase_timer
+from lolla.scheduling.layout import DEFAULT_LAYOUT, FestivalLayout
+from lolla.scheduling.log import set_verbosity
+from lolla.scheduling.placement import FreeSlotIndex
+from lolla.scheduling.validation import validate_schedule
 from lolla.scheduling import params
-from lolla.scheduling.artists import get_random_artist_of_size, Genre, ArtistSize
+from lolla.scheduling.artists import CATALOG, Genre, ArtistSize
+
+logger = logging.getLogger(__name__)
+
+# Called by the repair solvers with (iteration, number of conflicts) after every step
+StepCallback = Callable[[int, int], None]
 
 
 class CanNotConvergeError(Exception):
     """Exception raised when the schedule generation algorithm cannot converge to a valid schedule after a set number of iterations.
     
     This is usually a sign that we're stuck in a local minimum and need to restart the generation process.
+    The schedule the attempt ended on (if any) and its number of conflicts are attached so that the
+    best attempt can be kept.
     """
-    ...
 
+    def __init__(self, message: str, schedule: Optional[ScheduleGrid] = None, num_conflicts: Optional[int] = None):
+        super().__init__(message)
+        self.schedule = schedule
+        self.num_conflicts = num_conflicts
 
-def generate_valid_schedule() -> pd.DataFrame:
-    """Top-level function to generate a Lollapalooza schedule with all constraints satisfied."""
-    print("=" * 55 + "\nGenerating Lollapalooza Schedule\n" + "=" * 55)
-    try:
-        schedule_df = generate_initial_schedule()
-        print(f"Initial schedule:\n{schedule_df}")
-        return fix_schedule_conflicts(schedule_df)
-    except CanNotConvergeError:
-        return generate_valid_schedule()
 
+@dataclass
+class AttemptRecord:
+    """How a single generation attempt went."""
+    seconds: float
+    num_conflicts: Optional[int]
 
-def generate_initial_schedule() -> pd.DataFrame:
-    """Generate an initial schedule DataFrame with Artist objects assigned to stages and hours."""
-    schedule_df = pd.DataFrame(columns=STAGES, index=HOURS, data={})
-    schedule_df.index.name = "hour"
-    
-    event_frequency = random.uniform(
-        params.MIN_EVENT_FREQUENCY, params.MAX_EVENT_FREQUENCY
-    )
+    @property
+    def converged(self) -> bool:
+        return self.num_conflicts == 0
 
-    total_slots = len(STAGES) * len(HOURS)
-    num_small_artists = int(
-        total_slots * event_frequency * params.SMALL_ARTIST_FREQUENCY
-    )
-    num_medium_artists = int(
-        total_slots * event_frequency * params.MEDIUM_ARTIST_FREQUENCY
-    )
-    num_large_artists = int(
-        total_slots * event_frequency * params.LARGE_ARTIST_FRQUENCY
-    )
-    num_artists_total = num_small_artists + num_medium_artists + num_large_artists
 
-    artist_to_num = {
-        ArtistSize.SMALL: num_small_artists,
-        ArtistSize.MEDIUM: num_medium_artists,
-        ArtistSize.LARGE: num_large_artists,
-    }
+@dataclass
+class GenerationReport:
+    """The outcome of a bounded series of generation attempts."""
+    attempts: list[AttemptRecord] = field(default_factory=list)
+    best_schedule: Optional[ScheduleGrid] = None
+    best_num_conflicts: Optional[int] = None
+    total_seconds: float = 0.0
 
-    max_artists_per_genre = num_artists_total // len(Genre) + 1
-    count_per_genre = {Genre: 0 for Genre in Genre}
+    @property
+    def num_attempts(self) -> int:
+        return len(self.attempts)
 
-    artists_used = set()
+    @property
+    def is_valid(self) -> bool:
+        return self.best_num_conflicts == 0
 
-    for artist_size, artist_count in artist_to_num.items():
-        while artist_count > 0:
-            hour = random.choice(HOURS)
-            stage = random.choice(STAGES)
 
-            # This is super hacky -- the underlying data structure should reflect these limitations
-            # rather than random sampling
-            while True:
-                next_artist = get_random_artist_of_size(artist_size)
-                if next_artist.name in artists_used:
-                    continue
+class RestartController:
+    """Runs generation attempts until one converges, giving up after a number of attempts or amount of time.
 
-                if count_per_genre[next_artist.genre] >= max_artists_per_genre:
-                    continue
+    Every attempt is bounded on its own (a repair solver by its iteration limit, the ILP by the time left
+    before `max_seconds` via make_attempt's `deadline`), so checking the limits between attempts bounds the
+    total generation time as well.
+    """
 
-                artists_used.add(next_artist.name)
-                count_per_genre[next_artist.genre] += 1
-                artist_count -= 1
-                schedule_df.loc[hour, stage] = next_artist
+    def __init__(self, max_attempts: int = 100, max_seconds: float = 30.0):
+        self.max_attempts = max_attempts
+        self.max_seconds = max_seconds
+
+    def run(self, attempt: Callable[[], ScheduleGrid], stats: Optional[SolverStats] = None) -> GenerationReport:
+        """Call `attempt` until it returns a schedule or a limit is hit, keeping the best schedule seen."""
+        report = GenerationReport()
+        start = time.perf_counter()
+        if stats is not None:
+            stats.generations += 1
+
+        while report.num_attempts < self.max_attempts:
+            attempt_start = time.perf_counter()
+            try:
+                schedule, num_conflicts = attempt(), 0
+            except CanNotConvergeError as e:
+                schedule, num_conflicts = e.schedule, e.num_conflicts
+
+            report.attempts.append(AttemptRecord(time.perf_counter() - attempt_start, num_conflicts))
+            logger.info(
+                "Attempt %d ended with %s conflicts after %.3fs",
+                report.num_attempts,
+                num_conflicts,
+                report.attempts[-1].seconds,
+            )
+            if schedule is not None and (
+                report.best_num_conflicts is None or num_conflicts < report.best_num_conflicts
+            ):
+                report.best_schedule, report.best_num_conflicts = schedule, num_conflicts
+
+            if stats is not None:
+                stats.attempts += 1
+                stats.restarts += report.num_attempts > 1
+
+            report.total_seconds = time.perf_counter() - start
+            if report.is_valid or report.total_seconds >= self.max_seconds:
                 break
 
-    schedule_schema = pa.DataFrameSchema(
-        index=pa.Index(
-            pa.Int, name="hour", checks=pa.Check.in_range(HOURS[0], HOURS[-1])
-        ),
-        columns={
-            **{stage: pa.Column(object, nullable=True) for stage in STAGES},
-        },
-    )
+        if stats is not None:
+            stats.valid_generations += report.is_valid
+        return report
+
+
+def generate_valid_schedule(
+    strategy: str = "swap",
+    max_attempts: int = 100,
+    max_seconds: float = 30.0,
+    seed: Optional[int] = None,
+    layout: FestivalLayout = DEFAULT_LAYOUT,
+    stats: Optional[SolverStats] = None,
+    validate: bool = True,
+) -> pd.DataFrame:
+    """Top-level function to generate a Lollapalooza schedule with all constraints satisfied.
+
+    `strategy` selects the solver used to fix the conflicts in the initial schedule (see get_solver),
+    or "ilp" to solve for the whole schedule at once with an integer program.
+    `layout` sets the stages, hours and number of days of the festival.
+    If given, `stats` is updated with what happened during generation (see SolverStats).
+    With `validate`, the final schedule is checked against its pandera schema (see validate_schedule).
+    Raises CanNotConvergeError if no valid schedule is found within `max_attempts` attempts or `max_seconds`.
+    The same `seed` always produces the same schedule.
+    """
+    report = generate_schedule_with_report(strategy, max_attempts, max_seconds, seed, layout, stats=stats)
+    if not report.is_valid:
+        raise CanNotConvergeError(
+            f"No valid schedule after {report.num_attempts} attempts in {report.total_seconds:.1f}s",
+            schedule=report.best_schedule,
+            num_conflicts=report.best_num_conflicts,
+        )
+
+    schedule_df = report.best_schedule.to_df()
+    if validate:
+        with phase_timer(stats, "validation"):
+            validate_schedule(schedule_df, layout)
+    return schedule_df
 
-    print("=" * 55 + "\nSuccessfully Generated Schedule!\n" + "=" * 55)
-    return schedule_schema.validate(schedule_df)
 
+def generate_schedule_with_report(
+    strategy: str = "swap",
+    max_attempts: int = 100,
+    max_seconds: float = 30.0,
+    seed: Optional[int] = None,
+    layout: FestivalLayout = DEFAULT_LAYOUT,
+    on_step: Optional[StepCallback] = None,
+    stats: Optional[SolverStats] = None,
+) -> GenerationReport:
+    """Run bounded generation attempts and report the best schedule along with per-attempt timings.
 
-def fix_schedule_conflicts(schedule_df: pd.DataFrame, max_iterations: int = 1e3) -> pd.DataFrame:
-    """Iteratively fix schedule conflicts as they appear by swapping an event with a conflict with another."""
+    `on_step` and `stats` are passed on to the solver of every attempt (see fix_schedule_conflicts).
+    """
+    logger.info("Generating Lollapalooza schedule with the %s strategy", strategy)
+    rng = random.Random(seed)
+    attempt = make_attempt(strategy, rng, layout, on_step, stats, deadline=time.perf_counter() + max_seconds)
+    return RestartController(max_attempts, max_seconds).run(attempt, stats)
+
+
+def make_attempt(
+    strategy: str,
+    rng: random.Random,
+    layout: FestivalLayout = DEFAULT_LAYOUT,
+    on_step: Optional[StepCallback] = None,
+    stats: Optional[SolverStats] = None,
+    deadline: Optional[float] = None,
+) -> Callable[[], ScheduleGrid]:
+    """Build a function that makes a single generation attempt with the given strategy.
+
+    The attempt returns a valid schedule grid or raises CanNotConvergeError.
+    All of its randomness comes from `rng`, so repeated attempts continue the same random stream.
+    The ILP has no repair steps, so `on_step` is never called for it. It only encodes the built-in rules, so
+    its schedule is checked against every registered constraint, and rejected if any custom one is violated.
+    The ILP isn't bounded by an iteration limit, so given a `deadline` (a time.perf_counter() value) its
+    solver is stopped by then.
+    """
+    if strategy == "ilp":
+        from lolla.scheduling.ilp import generate_ilp_schedule
+
+        def ilp_attempt() -> ScheduleGrid:
+            time_limit = None
+            if deadline is not None:
+                time_limit = deadline - time.perf_counter()
+                if time_limit <= 0:
+                    raise CanNotConvergeError("No time left for an ILP attempt")
+            with phase_timer(stats, "ilp"):
+                grid = generate_ilp_schedule(seed=rng.getrandbits(32), time_limit=time_limit, layout=layout)
+            num_conflicts = get_conflict_masks(grid).count()
+            if num_conflicts:
+                raise CanNotConvergeError(
+                    f"ILP schedule violates registered constraints {num_conflicts} times",
+                    schedule=grid,
+                    num_conflicts=num_conflicts,
+                )
+            return grid
+
+        return ilp_attempt
+
+    solver = get_solver(strategy)
+
+    def attempt() -> ScheduleGrid:
+        grid = generate_initial_schedule(rng, layout=layout, stats=stats)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Initial schedule:\n%s", grid.to_df())
+        with phase_timer(stats, "repair"):
+            return solver(grid, rng=rng, on_step=on_step, stats=stats)
+
+    return attempt
+
+
+def get_solver(strategy: str) -> Callable[..., ScheduleGrid]:
+    """Look up a solver that fixes the conflicts in a schedule grid by name.
+
+    - "swap": swap conflicting concerts with random slots, accepting bad swaps 10% of the time
+    - "anneal": simulated annealing with a geometric cooling schedule
+    - "anneal-linear" / "anneal-adaptive": simulated annealing with other cooling schedules
+    """
+    # The annealing module builds on the swap moves defined here, so it's imported lazily
+    from lolla.scheduling.annealing import anneal_schedule_conflicts
+
+    solvers = {
+        "swap": fix_schedule_conflicts,
+        "anneal": anneal_schedule_conflicts,
+        "anneal-linear": lambda grid, **kwargs: anneal_schedule_conflicts(grid, cooling="linear", **kwargs),
+        "anneal-adaptive": lambda grid, **kwargs: anneal_schedule_conflicts(grid, cooling="adaptive", **kwargs),
+    }
+    if strategy not in solvers:
+        raise ValueError(f"Unknown solver strategy {strategy!r}, expected one of {sorted(solvers)}")
+    return solvers[strategy]
+
+
+def generate_initial_schedule(
+    rng: random.Random = random,
+    constructive: bool = True,
+    layout: FestivalLayout = DEFAULT_LAYOUT,
+    stats: Optional[SolverStats] = None,
+) -> ScheduleGrid:
+    """Generate an initial schedule grid with Artist objects assigned to stages and hours.
+
+    Artists are drawn without replacement for the festival as a whole, so nobody plays twice over a multi-day weekend.
+
+    With `constructive`, each artist is only placed into a free slot where it breaks no constraint
+    (see FreeSlotIndex), and artists that don't fit anywhere are left out. Otherwise artists are placed
+    into uniformly random slots, overwriting whatever was booked there, and the solver has to untangle the result.
+    """
+    with phase_timer(stats, "initialization"):
+        grid = ScheduleGrid.for_layout(layout)
+
+        event_frequency = rng.uniform(
+            params.MIN_EVENT_FREQUENCY, params.MAX_EVENT_FREQUENCY
+        )
+
+        total_slots = layout.num_cells
+        num_small_artists = int(
+            total_slots * event_frequency * params.SMALL_ARTIST_FREQUENCY
+        )
+        num_medium_artists = int(
+            total_slots * event_frequency * params.MEDIUM_ARTIST_FREQUENCY
+        )
+        num_large_artists = int(
+            total_slots * event_frequency * params.LARGE_ARTIST_FRQUENCY
+        )
+        num_artists_total = num_small_artists + num_medium_artists + num_large_artists
+
+        artist_to_num = {
+            ArtistSize.SMALL: num_small_artists,
+            ArtistSize.MEDIUM: num_medium_artists,
+            ArtistSize.LARGE: num_large_artists,
+        }
+
+        max_artists_per_genre = num_artists_total // len(Genre) + 1
+        sampler = CATALOG.sampler(rng)
+
+        if constructive:
+            free_slots = FreeSlotIndex(grid)
+            # Place the sizes with the fewest legal slots first so they don't get crowded out
+            artist_sizes = sorted(artist_to_num, key=free_slots.num_free)
+        else:
+            artist_sizes = list(artist_to_num)
+
+        for artist_size in artist_sizes:
+            for _ in range(artist_to_num[artist_size]):
+                if constructive:
+                    slot = free_slots.sample(artist_size, rng)
+                    if slot is None:
+                        # The grid can't fit any more artists of this size without a conflict
+                        break
+                    hour_idx, stage_idx = slot
+                else:
+                    hour_idx = rng.randrange(grid.num_hours)
+                    stage_idx = rng.randrange(grid.num_stages)
+
+                # Draws are without replacement, so every artist is used at most once
+                next_artist = sampler.draw(artist_size, max_per_genre=max_artists_per_genre)
+                if next_artist is None:
+                    # Every artist of this size is used up or in a genre that's at its cap
+                    break
+                grid.book(hour_idx, stage_idx, next_artist)
+                if constructive:
+                    free_slots.occupy(hour_idx, stage_idx)
+
+    logger.info("Generated an initial schedule with %d concerts", len(grid.artists))
+    return grid
+
+
+def fix_schedule_conflicts(
+    grid: ScheduleGrid,
+    max_iterations: int = 1e3,
+    rng: random.Random = random,
+    on_step: Optional[StepCallback] = None,
+    stats: Optional[SolverStats] = None,
+) -> ScheduleGrid:
+    """Iteratively fix schedule conflicts as they appear by swapping an event with a conflict with another.
+
+    If given, `on_step(iteration, num_conflicts)` is called after every swap (kept or undone),
+    and `stats` is updated with the iterations, kept and undone swaps, and conflicts by constraint.
+    Modifies the grid in place and returns it.
+    """
+    tracker = ConflictTracker(grid)
+    if stats is not None:
+        stats.record_conflicts(tracker.conflict_counts_by_name())
     iterations = 0
     while True:
-        conflict = get_first_schedule_conflict(schedule_df)
+        conflict = tracker.first_conflict()
         if conflict is None:
             break
 
-        potential_schedule = schedule_df.copy()
-        swapped_concert = swap_conflict_with_random(potential_schedule, conflict)
+        swapped_concert, original_concert = swap_conflict_with_random(tracker, conflict, rng)
 
         # If the swap doesn't resolve the conflict, take it anyway with 10% probability
         # Eventually, this can correspond be the temperature for simmulated annealing the cools during the algorithm
-        conflict_at_swap = check_for_conflicts(
-            potential_schedule, swapped_concert.stage, swapped_concert.hour
+        conflict_at_swap = tracker.has_conflict_at(
+            grid.hour_index(swapped_concert.hour, swapped_concert.day), grid.stage_index(swapped_concert.stage)
         )
-        conflict_at_original = check_for_conflicts(
-            potential_schedule, conflict.concert1.stage, conflict.concert1.hour
+        conflict_at_original = tracker.has_conflict_at(
+            grid.hour_index(conflict.concert1.hour, conflict.concert1.day), grid.stage_index(conflict.concert1.stage)
         )
 
-        if not (conflict_at_swap or conflict_at_original) or (random.random() < 0.1):
-            schedule_df = potential_schedule
+        rejected = (conflict_at_swap or conflict_at_original) and (rng.random() >= 0.1)
+        if rejected:
+            # Rejected -- undo the swap rather than copying the schedule up front
+            _swap_concerts(tracker, swapped_concert, original_concert)
         
         iterations += 1
+        if stats is not None:
+            stats.iterations += 1
+            stats.rejected_swaps += rejected
+            stats.accepted_swaps += not rejected
+        if on_step is not None:
+            on_step(iterations, tracker.num_conflicts)
         if iterations > max_iterations:
-            raise CanNotConvergeError(f"Unable to converge after {max_iterations} iterations.  Trying again.")
+            if stats is not None:
+                stats.record_conflicts(tracker.conflict_counts_by_name(), remaining=True)
+            raise CanNotConvergeError(
+                f"Unable to converge after {max_iterations} iterations.  Trying again.",
+                schedule=grid,
+                num_conflicts=tracker.num_conflicts,
+            )
 
-    print("No conflicts remaining")
-    return schedule_df
+    logger.info("No conflicts remaining after %d iterations", iterations)
+    return grid
 
 
-def swap_conflict_with_random(schedule_df: pd.DataFrame, conflict: ScheduleConflict):
-    """Modifies schedule_df in place by swapping a concert from the conflict with a random"""
-    print(f"Swapping slots due to {conflict}")
+def swap_conflict_with_random(
+    tracker: ConflictTracker, conflict: ScheduleConflict, rng: random.Random = random
+) -> tuple[Concert, Concert]:
+    """Modifies the tracked grid in place by swapping a concert from the conflict with a random slot.
 
-    concert_to_swap = random.choice((conflict.concert1, conflict.concert2))
-    this_artist = concert_to_swap.artist
-    this_stage = concert_to_swap.stage
-    this_hour = concert_to_swap.hour
+    Returns the randomly chosen concert and the concert it was swapped with (both as they were before the swap).
+    """
+    grid = tracker.grid
 
-    random_hour = random.choice(HOURS)
-    random_stage = random.choice(STAGES)
-    random_artist = schedule_df.loc[random_hour, random_stage]
-    random_concert = Concert(artist=random_artist, stage=random_stage, hour=random_hour)
+    concert_to_swap = rng.choice((conflict.concert1, conflict.concert2))
 
-    print(f"Swapping {conflict.concert1} and {random_concert}")
-    schedule_df.loc[this_hour, this_stage] = random_artist
-    schedule_df.loc[random_hour, random_stage] = this_artist
+    random_hour_idx = rng.randrange(grid.num_hours)
+    random_stage_idx = rng.randrange(grid.num_stages)
+    random_concert = grid.concert_at(random_hour_idx, random_stage_idx)
 
-    return random_concert
+    # Checked up front so that the quiet default doesn't even pay for the call in the repair loop
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Swapping %s and %s due to %s", concert_to_swap, random_concert, conflict)
+    _swap_concerts(tracker, concert_to_swap, random_concert)
+
+    return random_concert, concert_to_swap
+
+
+def _swap_concerts(tracker: ConflictTracker, concert1: Concert, concert2: Concert) -> int:
+    """Swap the bookings in the slots of two concerts, returning the change in the number of conflicts."""
+    grid = tracker.grid
+    return tracker.swap(
+        grid.hour_index(concert1.hour, concert1.day),
+        grid.stage_index(concert1.stage),
+        grid.hour_index(concert2.hour, concert2.day),
+        grid.stage_index(concert2.stage),
+    )
 
 
 if __name__ == "__main__":
+    set_verbosity(1)
     schedule_df = generate_valid_schedule()
     schedule_path = Path(__file__).parent.parent / "schedules" / "schedule.csv"
     schedule_df.to_csv(schedule_path, index=False)
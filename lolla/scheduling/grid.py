@@ -0,0 +1,146 @@
+"""A compact, array-backed schedule representation used by the solver.
+
+The solver only ever needs to know *which* artist is booked in a given (hour, stage) slot,
+so the schedule is stored as a small integer array of artist IDs plus a side table that maps
+each ID back to its Artist. Converting to a DataFrame only happens at the edges (the app and CSV export).
+The days of a multi-day festival are stacked on top of each other, so a row of the grid is one hour of one day
+(see FestivalLayout).
+"""
+
+from __future__ import annotations
+
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from lolla.scheduling.artists import Artist
+from lolla.scheduling.constants import STAGES, HOURS
+from lolla.scheduling.layout import DEFAULT_LAYOUT, FestivalLayout
+from lolla.scheduling.wrappers import Concert
+
+# Artist ID stored in slots with no booked concert
+EMPTY = -1
+
+
+class ScheduleGrid:
+    """Artist IDs indexed by (hour, stage), plus a side table of the artists those IDs refer to."""
+
+    def __init__(self, cells: np.ndarray, artists: list[Artist], layout: FestivalLayout = DEFAULT_LAYOUT):
+        self.cells = cells
+        self.artists = artists
+        self.layout = layout
+        # Hour and day labels of every row
+        self.hours = layout.row_hours()
+        self.days = layout.row_days()
+        self.stages = list(layout.stages)
+
+        self._sizes: Optional[np.ndarray] = None
+        self._hour_index = {(int(day), int(hour)): i for i, (day, hour) in enumerate(zip(self.days, self.hours))}
+        self._stage_index = {stage: i for i, stage in enumerate(self.stages)}
+
+    @classmethod
+    def empty(cls, hours: Iterable[int] = HOURS, stages: Iterable[str] = STAGES, num_days: int = 1) -> ScheduleGrid:
+        """Create a grid with no concerts booked."""
+        return cls.for_layout(FestivalLayout.from_labels(hours, stages, num_days))
+
+    @classmethod
+    def for_layout(cls, layout: FestivalLayout) -> ScheduleGrid:
+        """Create a grid with no concerts booked for the given festival layout."""
+        cells = np.full((layout.num_rows, len(layout.stages)), EMPTY, dtype=np.int32)
+        return cls(cells, [], layout)
+
+    @property
+    def num_hours(self) -> int:
+        """Number of rows, i.e. hour slots over every day of the festival."""
+        return self.cells.shape[0]
+
+    @property
+    def num_stages(self) -> int:
+        return self.cells.shape[1]
+
+    def hour_index(self, hour: int, day: int = 1) -> int:
+        """The row of an hour on a given day."""
+        return self._hour_index[int(day), int(hour)]
+
+    def stage_index(self, stage: str) -> int:
+        return self._stage_index[stage]
+
+    def is_booked(self, hour_idx: int, stage_idx: int) -> bool:
+        return self.cells[hour_idx, stage_idx] != EMPTY
+
+    def artist_at(self, hour_idx: int, stage_idx: int) -> Optional[Artist]:
+        """Return the Artist booked in a slot, or None if the slot is free."""
+        artist_id = self.cells[hour_idx, stage_idx]
+        if artist_id == EMPTY:
+            return None
+        return self.artists[artist_id]
+
+    def concert_at(self, hour_idx: int, stage_idx: int) -> Concert:
+        """Wrap a slot in a Concert, using the stage name and hour labels."""
+        return Concert(
+            artist=self.artist_at(hour_idx, stage_idx),
+            stage=self.stages[stage_idx],
+            hour=int(self.hours[hour_idx]),
+            day=int(self.days[hour_idx]),
+        )
+
+    def book(self, hour_idx: int, stage_idx: int, artist: Artist) -> None:
+        """Add an artist to the side table and book them in the given slot, replacing any existing booking."""
+        self.artists.append(artist)
+        self.cells[hour_idx, stage_idx] = len(self.artists) - 1
+        self._sizes = None
+
+    def swap(self, hour_idx1: int, stage_idx1: int, hour_idx2: int, stage_idx2: int) -> None:
+        """Swap the bookings of two slots in place."""
+        cells = self.cells
+        cells[hour_idx1, stage_idx1], cells[hour_idx2, stage_idx2] = (
+            cells[hour_idx2, stage_idx2],
+            cells[hour_idx1, stage_idx1],
+        )
+
+    def stage_counts(self) -> np.ndarray:
+        """Number of concerts booked on each stage."""
+        return np.count_nonzero(self.cells != EMPTY, axis=0)
+
+    def booked_mask(self) -> np.ndarray:
+        """Boolean array that is True wherever a concert is booked."""
+        return self.cells != EMPTY
+
+    def size_values(self) -> np.ndarray:
+        """Array of the booked artists' ArtistSize values, with 0 in free slots."""
+        if self._sizes is None:
+            # The trailing 0 is what EMPTY (-1) indexes
+            self._sizes = np.array([artist.size.value for artist in self.artists] + [0], dtype=np.int8)
+        return self._sizes[self.cells]
+
+    def copy(self) -> ScheduleGrid:
+        return ScheduleGrid(self.cells.copy(), list(self.artists), self.layout)
+
+    def to_df(self) -> pd.DataFrame:
+        """Convert to a DataFrame of Artist objects (pd.NA for free slots) with one column per stage.
+
+        The index is the hour for a single-day festival, and (day, hour) over several days.
+        """
+        lookup = np.empty(len(self.artists) + 1, dtype=object)
+        lookup[:-1] = self.artists
+        lookup[-1] = pd.NA
+        # EMPTY (-1) indexes the trailing pd.NA entry
+        data = lookup[self.cells]
+
+        return pd.DataFrame(data, index=self.layout.index(), columns=self.stages)
+
+    @classmethod
+    def from_df(cls, schedule_df: pd.DataFrame) -> ScheduleGrid:
+        """Build a grid from a DataFrame of Artist objects laid out like the ones to_df returns."""
+        if isinstance(schedule_df.index, pd.MultiIndex):
+            days = schedule_df.index.get_level_values("day").unique()
+            hours = schedule_df.index.get_level_values("hour")[: len(schedule_df) // len(days)]
+            grid = cls.empty(hours=hours, stages=schedule_df.columns, num_days=len(days))
+        else:
+            grid = cls.empty(hours=schedule_df.index.to_numpy(), stages=schedule_df.columns)
+        for stage_idx, stage in enumerate(grid.stages):
+            for hour_idx, artist in enumerate(schedule_df[stage]):
+                if isinstance(artist, Artist):
+                    grid.book(hour_idx, stage_idx, artist)
+        return grid
@@ -0,0 +1,145 @@
+"""An exact schedule generator that encodes every constraint in a single integer program.
+
+Artists of the same size and genre are interchangeable as far as the constraints are concerned, so the
+program decides how many concerts of each (size, genre) bucket go in each slot, and specific artists are
+drawn from the buckets afterwards. The program is solved with the CBC solver bundled with PuLP.
+"""
+
+import math
+import random
+from collections import defaultdict
+from typing import Optional
+
+import pulp
+
+from lolla.scheduling import params
+from lolla.scheduling.artists import ArtistSize, Genre, size_to_artist_dict
+from lolla.scheduling.constraints import get_rules
+from lolla.scheduling.generate_schedule import CanNotConvergeError
+from lolla.scheduling.grid import ScheduleGrid
+from lolla.scheduling.layout import DEFAULT_LAYOUT, FestivalLayout
+
+SIZE_FREQUENCIES = {
+    ArtistSize.SMALL: params.SMALL_ARTIST_FREQUENCY,
+    ArtistSize.MEDIUM: params.MEDIUM_ARTIST_FREQUENCY,
+    ArtistSize.LARGE: params.LARGE_ARTIST_FRQUENCY,
+}
+
+
+def generate_ilp_schedule(
+    seed: Optional[int] = None,
+    time_limit: Optional[float] = None,
+    layout: FestivalLayout = DEFAULT_LAYOUT,
+) -> ScheduleGrid:
+    """Generate a schedule that satisfies every constraint with one integer program solve.
+
+    The days of a multi-day layout are one program, since artists are shared between them (each plays at most once).
+
+    Without a seed the result is deterministic. With a seed, ties between equally good schedules are broken
+    randomly and artists are drawn from their buckets in a shuffled order, so different seeds give different lineups.
+
+    The event frequency range from params is treated as a target: the grid can't always fit that many concerts
+    once the consecutive-booking and neighbor-stage rules are applied, so the program books as close to the
+    minimum as the other constraints allow rather than failing outright.
+    """
+    rng = random.Random(seed) if seed is not None else None
+    rules = get_rules()
+    stages = layout.stages
+    num_rows, hours_per_day = layout.num_rows, layout.hours_per_day
+    problem = pulp.LpProblem("lollapalooza_schedule", pulp.LpMinimize)
+
+    buckets = [(size, genre) for size in ArtistSize for genre in Genre]
+    # x[hour, stage, size, genre] is 1 if an artist of that size and genre plays that slot.
+    # Sizes outside the hour's size window never get a variable, which encodes that constraint for free.
+    x = {
+        (hour_idx, stage_idx, size, genre): pulp.LpVariable(
+            f"x_{hour_idx}_{stage_idx}_{size.name}_{genre.name}", cat=pulp.LpBinary
+        )
+        for hour_idx, hour in enumerate(layout.row_hours())
+        for stage_idx in range(len(stages))
+        for size, genre in buckets
+        if size in rules.allowed_sizes(int(hour))
+    }
+
+    slot_vars = defaultdict(list)
+    for (hour_idx, stage_idx, _, _), var in x.items():
+        slot_vars[hour_idx, stage_idx].append(var)
+    booked_slots = {
+        (hour_idx, stage_idx): pulp.lpSum(slot_vars[hour_idx, stage_idx])
+        for hour_idx in range(num_rows)
+        for stage_idx in range(len(stages))
+    }
+    num_concerts = pulp.lpSum(booked_slots.values())
+
+    for (hour_idx, stage_idx), slot in booked_slots.items():
+        # At most one concert per slot
+        problem += slot <= 1
+        # No consecutive bookings on a stage (the last hour of a day doesn't run into the next day)
+        if rules.no_back_to_back and (hour_idx + 1) % hours_per_day != 0:
+            problem += slot + booked_slots[hour_idx + 1, stage_idx] <= 1
+
+    # Neighboring stages can't play at the same time
+    for stage1, stage2 in rules.neighbor_pairs:
+        if stage1 not in stages or stage2 not in stages:
+            continue
+        stage_idx1, stage_idx2 = stages.index(stage1), stages.index(stage2)
+        for hour_idx in range(num_rows):
+            problem += booked_slots[hour_idx, stage_idx1] + booked_slots[hour_idx, stage_idx2] <= 1
+
+    # Every stage needs a minimum number of performances each day
+    for day_start in range(0, num_rows, hours_per_day):
+        for stage_idx in range(len(stages)):
+            problem += (
+                pulp.lpSum(booked_slots[hour_idx, stage_idx] for hour_idx in range(day_start, day_start + hours_per_day))
+                >= rules.min_artists_per_stage
+            )
+
+    # Event frequency, with slack below the minimum that the objective drives towards zero
+    total_slots = layout.num_cells
+    shortfall = pulp.LpVariable("shortfall", lowBound=0)
+    problem += num_concerts <= math.floor(total_slots * params.MAX_EVENT_FREQUENCY)
+    problem += num_concerts + shortfall >= math.ceil(total_slots * params.MIN_EVENT_FREQUENCY)
+
+    def bucket_count(size: Optional[ArtistSize] = None, genre: Optional[Genre] = None) -> pulp.LpAffineExpression:
+        return pulp.lpSum(
+            var for (_, _, s, g), var in x.items() if size in (None, s) and genre in (None, g)
+        )
+
+    # Each artist size makes up its share of the lineup (within one concert of rounding)
+    for size, frequency in SIZE_FREQUENCIES.items():
+        problem += bucket_count(size=size) - frequency * num_concerts <= 1
+        problem += bucket_count(size=size) - frequency * num_concerts >= -1
+
+    # No genre takes more than its share of the lineup
+    for genre in Genre:
+        problem += bucket_count(genre=genre) <= num_concerts * (1 / len(Genre)) + 1
+
+    # Every artist plays at most once, so a bucket can't be used more often than it has artists
+    artists_by_bucket = {
+        (size, genre): [artist for artist in size_to_artist_dict[size] if artist.genre == genre]
+        for size, genre in buckets
+    }
+    for (size, genre), artists in artists_by_bucket.items():
+        problem += bucket_count(size=size, genre=genre) <= len(artists)
+
+    objective = len(x) * shortfall
+    if rng is not None:
+        # Small random preferences break ties between otherwise equally good schedules
+        objective += pulp.lpSum(rng.random() * var for var in x.values())
+    problem += objective
+
+    status = problem.solve(pulp.PULP_CBC_CMD(msg=False, timeLimit=time_limit))
+    if pulp.LpStatus[status] != "Optimal":
+        raise CanNotConvergeError(f"ILP solver finished with status {pulp.LpStatus[status]}")
+
+    grid = ScheduleGrid.for_layout(layout)
+    remaining = {bucket: list(artists) for bucket, artists in artists_by_bucket.items()}
+    if rng is not None:
+        for artists in remaining.values():
+            rng.shuffle(artists)
+
+    for (hour_idx, stage_idx, size, genre), var in x.items():
+        if var.value() is not None and var.value() > 0.5:
+            grid.book(hour_idx, stage_idx, remaining[size, genre].pop(0))
+
+    return grid
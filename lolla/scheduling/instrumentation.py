@@ -0,0 +1,127 @@
+"""Counters and timings that describe what the schedule generator is doing.
+
+Pass a SolverStats to generate_valid_schedule (or any of the solvers) and it is filled in as generation runs.
+Stats from several generations can be merged, and exported in the Prometheus text format for scraping.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import ContextManager, Iterator, Optional
+
+# Name, type and help text of every exported metric, in export order
+_METRICS = (
+    ("generations_total", "counter", "Schedule generations started."),
+    ("valid_generations_total", "counter", "Schedule generations that produced a valid schedule."),
+    ("attempts_total", "counter", "Generation attempts, including restarts."),
+    ("restarts_total", "counter", "Attempts after the first of a generation."),
+    ("reheats_total", "counter", "Times the annealing solver reheated from its best schedule."),
+    ("iterations_total", "counter", "Repair iterations run by the solvers."),
+    ("accepted_swaps_total", "counter", "Repair swaps that were kept."),
+    ("rejected_swaps_total", "counter", "Repair swaps that were undone."),
+    ("acceptance_rate", "gauge", "Fraction of repair swaps that were kept."),
+)
+
+
+@dataclass
+class SolverStats:
+    """Running totals over any number of schedule generations."""
+    generations: int = 0
+    valid_generations: int = 0
+    attempts: int = 0
+    restarts: int = 0
+    reheats: int = 0
+    iterations: int = 0
+    accepted_swaps: int = 0
+    rejected_swaps: int = 0
+    # Violations of each constraint in the schedules handed to a repair solver
+    initial_conflicts: Counter = field(default_factory=Counter)
+    # Violations of each constraint left in attempts that didn't converge
+    remaining_conflicts: Counter = field(default_factory=Counter)
+    # Seconds spent in each phase of generation, e.g. "initialization", "repair" and "validation"
+    phase_seconds: Counter = field(default_factory=Counter)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False, compare=False)
+
+    @property
+    def acceptance_rate(self) -> Optional[float]:
+        """The fraction of repair swaps that were kept, or None before any swap."""
+        num_swaps = self.accepted_swaps + self.rejected_swaps
+        if num_swaps == 0:
+            return None
+        return self.accepted_swaps / num_swaps
+
+    @contextlib.contextmanager
+    def timer(self, phase: str) -> Iterator[None]:
+        """Add the time spent in the `with` block to a phase."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phase_seconds[phase] += time.perf_counter() - start
+
+    def record_conflicts(self, counts: Counter, remaining: bool = False) -> None:
+        """Add violation counts by constraint name to the initial (or, with `remaining`, the left-over) totals."""
+        (self.remaining_conflicts if remaining else self.initial_conflicts).update(counts)
+
+    def merge(self, other: SolverStats) -> None:
+        """Add another set of stats to this one. Safe to call from several threads at once."""
+        with self._lock:
+            self.generations += other.generations
+            self.valid_generations += other.valid_generations
+            self.attempts += other.attempts
+            self.restarts += other.restarts
+            self.reheats += other.reheats
+            self.iterations += other.iterations
+            self.accepted_swaps += other.accepted_swaps
+            self.rejected_swaps += other.rejected_swaps
+            self.initial_conflicts.update(other.initial_conflicts)
+            self.remaining_conflicts.update(other.remaining_conflicts)
+            self.phase_seconds.update(other.phase_seconds)
+
+    def to_prometheus(self, prefix: str = "lolla_solver_") -> str:
+        """Render the stats in the Prometheus text exposition format."""
+        with self._lock:
+            lines = []
+            for name, metric_type, help_text in _METRICS:
+                value = getattr(self, name.removesuffix("_total"))
+                if value is None:
+                    continue
+                lines += [
+                    f"# HELP {prefix}{name} {help_text}",
+                    f"# TYPE {prefix}{name} {metric_type}",
+                    f"{prefix}{name} {value}",
+                ]
+            lines += _labelled(
+                f"{prefix}initial_conflicts_total",
+                "Constraint violations in schedules handed to a repair solver.",
+                "constraint",
+                self.initial_conflicts,
+            )
+            lines += _labelled(
+                f"{prefix}remaining_conflicts_total",
+                "Constraint violations left in attempts that didn't converge.",
+                "constraint",
+                self.remaining_conflicts,
+            )
+            lines += _labelled(
+                f"{prefix}phase_seconds_total", "Seconds spent in each phase of generation.", "phase", self.phase_seconds
+            )
+            return "\n".join(lines) + "\n"
+
+
+def phase_timer(stats: Optional[SolverStats], phase: str) -> ContextManager:
+    """Time a phase into `stats`, or do nothing if there are no stats to record into."""
+    if stats is None:
+        return contextlib.nullcontext()
+    return stats.timer(phase)
+
+
+def _labelled(name: str, help_text: str, label: str, values: Counter) -> list[str]:
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+    for key, value in sorted(values.items()):
+        lines.append(f'{name}{{{label}="{key}"}} {value}')
+    return lines
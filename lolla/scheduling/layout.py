@@ -0,0 +1,71 @@
+"""The shape of the festival: which stages there are, which hours they play and for how many days.
+
+A multi-day schedule is laid out as one grid whose rows run through the hours of the first day, then the
+hours of the second day and so on, so the solvers can treat it like a single (taller) day. The constraints
+use the layout to keep rules that are about a single day (no back-to-back concerts, the per-stage minimum)
+from reaching across a day boundary.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+from lolla.scheduling.constants import HOURS, STAGES
+
+
+@dataclass(frozen=True)
+class FestivalLayout:
+    """The stages, the hours of each day, and the number of days of a festival."""
+    stages: tuple[str, ...] = tuple(STAGES)
+    hours: tuple[int, ...] = tuple(int(hour) for hour in HOURS)
+    num_days: int = 1
+
+    def __post_init__(self):
+        # Accept any iterable (e.g. a list or numpy range) but store tuples so the layout stays hashable
+        object.__setattr__(self, "stages", tuple(self.stages))
+        object.__setattr__(self, "hours", tuple(int(hour) for hour in self.hours))
+        if self.num_days < 1:
+            raise ValueError(f"A festival needs at least one day, got {self.num_days}")
+
+    @classmethod
+    def from_labels(cls, hours: Iterable[int], stages: Iterable[str], num_days: int = 1) -> FestivalLayout:
+        return cls(stages=tuple(stages), hours=tuple(hours), num_days=num_days)
+
+    @property
+    def days(self) -> tuple[int, ...]:
+        """Day labels, starting at 1."""
+        return tuple(range(1, self.num_days + 1))
+
+    @property
+    def hours_per_day(self) -> int:
+        return len(self.hours)
+
+    @property
+    def num_rows(self) -> int:
+        """Number of hour slots over the whole festival."""
+        return self.num_days * len(self.hours)
+
+    @property
+    def num_cells(self) -> int:
+        return self.num_rows * len(self.stages)
+
+    def row_hours(self) -> np.ndarray:
+        """The hour label of every row of the grid."""
+        return np.tile(np.asarray(self.hours, dtype=int), self.num_days)
+
+    def row_days(self) -> np.ndarray:
+        """The day label of every row of the grid."""
+        return np.repeat(np.asarray(self.days, dtype=int), len(self.hours))
+
+    def index(self) -> pd.Index:
+        """The DataFrame index of a schedule: the hour for a single day, or (day, hour) over several days."""
+        if self.num_days == 1:
+            return pd.Index(self.row_hours(), name="hour")
+        return pd.MultiIndex.from_arrays([self.row_days(), self.row_hours()], names=["day", "hour"])
+
+
+DEFAULT_LAYOUT = FestivalLayout()
@@ -0,0 +1,30 @@
+"""Logging setup for the solver and the app.
+
+Everything logs through loggers under "lolla". Nothing is printed by default: the library only logs warnings
+and errors until set_verbosity raises the level, and the solver's per-iteration messages are only formatted
+when debug logging is on.
+"""
+
+import logging
+
+# Verbosity -> log level of the "lolla" loggers
+VERBOSITY_LEVELS = {
+    0: logging.WARNING,  # quiet: only problems
+    1: logging.INFO,  # progress of each generation
+    2: logging.DEBUG,  # every swap of the repair loop
+}
+
+_logger = logging.getLogger("lolla")
+_logger.addHandler(logging.NullHandler())
+_logger.setLevel(logging.WARNING)
+_handler = None
+
+
+def set_verbosity(verbosity: int) -> None:
+    """Set how much the solver and app log (0 is quiet, 1 is progress, 2 is every solver step) to stderr."""
+    global _handler
+    _logger.setLevel(VERBOSITY_LEVELS[min(max(verbosity, 0), max(VERBOSITY_LEVELS))])
+    if _handler is None:
+        _handler = logging.StreamHandler()
+        _handler.setFormatter(logging.Formatter("%(asctime)s %(name)s %(levelname)s %(message)s"))
+        _logger.addHandler(_handler)
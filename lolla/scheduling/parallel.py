@@ -0,0 +1,141 @@
+"""Generate schedules on a pool of processes by racing independent generation attempts.
+
+Each attempt is an independent random restart, so running several at once across CPU cores cuts the
+long tail of generation latency, and lets bulk generation (e.g. for printed game decks) use every core.
+"""
+
+import os
+import random
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from lolla.scheduling.generate_schedule import CanNotConvergeError, make_attempt
+from lolla.scheduling.grid import ScheduleGrid
+from lolla.scheduling.layout import DEFAULT_LAYOUT, FestivalLayout
+from lolla.scheduling.validation import validate_schedule
+
+
+def generate_valid_schedule_parallel(
+    strategy: str = "swap",
+    num_workers: Optional[int] = None,
+    max_attempts: int = 100,
+    max_seconds: float = 30.0,
+    seed: Optional[int] = None,
+    layout: FestivalLayout = DEFAULT_LAYOUT,
+    validate: bool = True,
+) -> pd.DataFrame:
+    """Race generation attempts across `num_workers` processes and return the first valid schedule.
+
+    Attempts that haven't started yet are cancelled once a valid schedule is found.
+    Raises CanNotConvergeError if no attempt succeeds within `max_attempts` attempts or `max_seconds`.
+    Every attempt gets an independent random stream derived from `seed`, but which attempt wins the race
+    depends on timing, so only serial generation is reproducible schedule for schedule.
+    With `validate`, the schedule is checked against its pandera schema (see validate_schedule).
+    """
+    schedules = _generate_schedules(1, strategy, num_workers, max_attempts, max_seconds, seed, layout)
+    schedule_df = schedules[0].to_df()
+    if validate:
+        validate_schedule(schedule_df, layout)
+    return schedule_df
+
+
+def generate_schedule_batch(
+    num_schedules: int,
+    strategy: str = "swap",
+    num_workers: Optional[int] = None,
+    max_attempts: Optional[int] = None,
+    max_seconds: Optional[float] = None,
+    seed: Optional[int] = None,
+    layout: FestivalLayout = DEFAULT_LAYOUT,
+    validate: bool = True,
+) -> list[pd.DataFrame]:
+    """Generate `num_schedules` distinct valid schedules in parallel.
+
+    By default up to 10 attempts per schedule are allowed, with no time limit.
+    With `validate`, every schedule is checked against its pandera schema.
+    Raises CanNotConvergeError if not enough distinct schedules are found within the limits.
+    """
+    if max_attempts is None:
+        max_attempts = 10 * num_schedules
+    schedules = _generate_schedules(num_schedules, strategy, num_workers, max_attempts, max_seconds, seed, layout)
+    schedule_dfs = [grid.to_df() for grid in schedules]
+    if validate:
+        for schedule_df in schedule_dfs:
+            validate_schedule(schedule_df, layout)
+    return schedule_dfs
+
+
+def _generate_schedules(
+    num_schedules: int,
+    strategy: str,
+    num_workers: Optional[int],
+    max_attempts: int,
+    max_seconds: Optional[float],
+    seed: Optional[int],
+    layout: FestivalLayout,
+) -> list[ScheduleGrid]:
+    start = time.perf_counter()
+    # Spawned seed sequences give every attempt a statistically independent random stream
+    seed_sequence = np.random.SeedSequence(seed)
+    num_workers = num_workers or os.cpu_count() or 1
+    # Keyed by the schedule contents so that duplicate schedules are only counted once
+    schedules: dict[tuple, ScheduleGrid] = {}
+    pending: set[Future] = set()
+    num_submitted = 0
+
+    executor = ProcessPoolExecutor(num_workers)
+    try:
+        while len(schedules) < num_schedules:
+            # Keep every worker busy until we run out of attempts
+            while len(pending) < num_workers and num_submitted < max_attempts:
+                attempt_seed = int(seed_sequence.spawn(1)[0].generate_state(1, dtype=np.uint64)[0])
+                seconds_left = None if max_seconds is None else max_seconds - (time.perf_counter() - start)
+                pending.add(executor.submit(_run_attempt, strategy, attempt_seed, layout, seconds_left))
+                num_submitted += 1
+            if not pending:
+                break
+
+            timeout = None if max_seconds is None else max(max_seconds - (time.perf_counter() - start), 0)
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                break  # Out of time
+
+            for future in done:
+                grid = future.result()
+                if grid is not None:
+                    schedules.setdefault(_schedule_key(grid), grid)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    if len(schedules) < num_schedules:
+        raise CanNotConvergeError(
+            f"Found {len(schedules)} of {num_schedules} valid schedules after {num_submitted} attempts"
+        )
+    return list(schedules.values())[:num_schedules]
+
+
+def _run_attempt(
+    strategy: str, seed: int, layout: FestivalLayout, seconds_left: Optional[float] = None
+) -> Optional[ScheduleGrid]:
+    """Make a single generation attempt in a worker process, returning None if it doesn't converge.
+
+    With `seconds_left`, an ILP attempt is stopped after that long, so it can't outlive the generation's time limit.
+    """
+    # The deadline is taken in the worker, since perf_counter values aren't comparable between processes
+    deadline = None if seconds_left is None else time.perf_counter() + seconds_left
+    try:
+        return make_attempt(strategy, random.Random(seed), layout, deadline=deadline)()
+    except CanNotConvergeError:
+        return None
+
+
+def _schedule_key(grid: ScheduleGrid) -> tuple:
+    """A hashable key that is equal for two grids exactly when they book the same artists in the same slots."""
+    return tuple(
+        None if artist is None else artist.name
+        for artist in (grid.artist_at(h, s) for h in range(grid.num_hours) for s in range(grid.num_stages))
+    )
@@ -0,0 +1,80 @@
+"""Bookkeeping for placing artists only into slots where they don't break any constraint."""
+
+import random
+from typing import Optional
+
+import numpy as np
+
+from lolla.scheduling.artists import ArtistSize
+from lolla.scheduling.constraints import compile_rules
+from lolla.scheduling.grid import ScheduleGrid
+
+Slot = tuple[int, int]
+
+
+class FreeSlotIndex:
+    """The free (hour index, stage index) slots each artist size can legally be booked into.
+
+    A slot is legal for a size if the size is allowed at that hour, the slot is free, neither the hour before
+    nor after (on the same day) is booked on the same stage, and the neighboring stage (if any) is free at that hour.
+    Each size keeps its slots in a list plus a position index, so sampling and removing a slot are constant-time.
+    """
+
+    def __init__(self, grid: ScheduleGrid):
+        rules = compile_rules(grid)
+        self._last_hour_of_day = rules.last_hour_of_day
+        self._neighbors = rules.neighbor_indices
+        self._no_back_to_back = rules.no_back_to_back
+        allowed = rules.allowed_sizes
+
+        self._slots: dict[ArtistSize, list[Slot]] = {}
+        self._positions: dict[ArtistSize, dict[Slot, int]] = {}
+        for size in ArtistSize:
+            slots = [
+                (hour_idx, stage_idx)
+                for hour_idx in np.flatnonzero(allowed[:, size.value]).tolist()
+                for stage_idx in range(grid.num_stages)
+            ]
+            self._slots[size] = slots
+            self._positions[size] = {slot: i for i, slot in enumerate(slots)}
+
+        # Slots that are already booked (and their surroundings) aren't free
+        for hour_idx, stage_idx in zip(*np.nonzero(grid.booked_mask())):
+            self.occupy(int(hour_idx), int(stage_idx))
+
+    def num_free(self, size: ArtistSize) -> int:
+        return len(self._slots[size])
+
+    def sample(self, size: ArtistSize, rng: random.Random = random) -> Optional[Slot]:
+        """Return a random legal slot for the given size, or None if there are none left."""
+        slots = self._slots[size]
+        if not slots:
+            return None
+        return slots[rng.randrange(len(slots))]
+
+    def occupy(self, hour_idx: int, stage_idx: int) -> None:
+        """Mark a slot as booked, which also blocks the adjacent hours on its stage and its neighbor stage."""
+        blocked = [(hour_idx, stage_idx)]
+        if self._no_back_to_back and hour_idx > 0 and not self._last_hour_of_day[hour_idx - 1]:
+            blocked.append((hour_idx - 1, stage_idx))
+        if self._no_back_to_back and not self._last_hour_of_day[hour_idx]:
+            blocked.append((hour_idx + 1, stage_idx))
+        neighbor_idx = int(self._neighbors[stage_idx])
+        if neighbor_idx >= 0:
+            blocked.append((hour_idx, neighbor_idx))
+
+        for size in ArtistSize:
+            for slot in blocked:
+                self._remove(size, slot)
+
+    def _remove(self, size: ArtistSize, slot: Slot) -> None:
+        positions = self._positions[size]
+        position = positions.pop(slot, None)
+        if position is None:
+            return
+        # Swap-remove: move the last slot into the freed position
+        slots = self._slots[size]
+        last = slots.pop()
+        if last != slot:
+            slots[position] = last
+            positions[last] = position
@@ -0,0 +1,34 @@
+"""Checks that a generated schedule DataFrame has the expected shape.
+
+pandera is slow to import, so it is only imported the first time a schedule is validated, and the schema
+for each festival layout is only built once.
+"""
+
+from functools import lru_cache
+
+import pandas as pd
+
+from lolla.scheduling.layout import DEFAULT_LAYOUT, FestivalLayout
+
+
+@lru_cache(maxsize=16)
+def get_schedule_schema(layout: FestivalLayout = DEFAULT_LAYOUT):
+    """The pandera schema of a schedule DataFrame for the given layout (see ScheduleGrid.to_df)."""
+    import pandera as pa
+
+    hour_index = pa.Index(pa.Int, name="hour", checks=pa.Check.in_range(min(layout.hours), max(layout.hours)))
+    if layout.num_days > 1:
+        hour_index = pa.MultiIndex(
+            [pa.Index(pa.Int, name="day", checks=pa.Check.in_range(1, layout.num_days)), hour_index]
+        )
+    return pa.DataFrameSchema(
+        index=hour_index,
+        columns={
+            **{stage: pa.Column(object, nullable=True) for stage in layout.stages},
+        },
+    )
+
+
+def validate_schedule(schedule_df: pd.DataFrame, layout: FestivalLayout = DEFAULT_LAYOUT) -> pd.DataFrame:
+    """Validate a schedule DataFrame against the schema for its layout, raising a pandera SchemaError if it fails."""
+    return get_schedule_schema(layout).validate(schedule_df)
@@ -1,39 +1,52 @@
 from __future__ import annotations
 
-from lolla.scheduling.artists import ArtistSize
+from dataclasses import dataclass
+from numbers import Integral
+from typing import Optional
 
+from lolla.scheduling.artists import Artist, ArtistSize
+
+
+@dataclass(frozen=True, slots=True)
 class Concert:
-    """A class that represents a concert with a specific Artist, Stage, and Hour."""
-    def __init__(self, artist: ArtistSize, stage: str, hour: int):
-        self.artist = artist
-        self.hour = hour
-        self.stage = stage
+    """A class that represents a concert with a specific Artist, Stage, and Hour (on a day of the festival).
+
+    The artist is None for a free slot.
+    """
+    artist: Optional[Artist]
+    stage: str
+    hour: int
+    day: int = 1
 
+    def __post_init__(self):
         if not (
-            isinstance(artist, ArtistSize)
-            or isinstance(stage, str)
-            or isinstance(hour, int)
+            (self.artist is None or isinstance(self.artist, Artist))
+            and isinstance(self.stage, str)
+            and isinstance(self.hour, Integral)
+            and isinstance(self.day, Integral)
         ):
             raise ValueError(f"Invalid Concert: {self}")
 
     def __repr__(self) -> str:
+        if self.day != 1:
+            return f"{self.artist} at {self.hour}:00 on day {self.day} at {self.stage}"
         return f"{self.artist} at {self.hour}:00 at {self.stage}"
 
 
+@dataclass(frozen=True, slots=True, eq=False)
 class ScheduleConflict:
     """A class that represents two concerts that somehow conflict with each other."""
-
-    def __init__(
-        self,
-        concert1: Concert,
-        concert2: Concert,
-    ):
-        self.concert1 = concert1
-        self.concert2 = concert2
+    concert1: Concert
+    concert2: Concert
 
     def __str__(self):
         return f"Conflict between {self.concert1} and {self.concert2}"
 
     def __eq__(self, other: ScheduleConflict) -> bool:
-        others = (other.concert1, other.concert2)
-        return self.concert1 in others and self.concert2 in others
+        # The order of the two concerts doesn't matter
+        if not isinstance(other, ScheduleConflict):
+            return NotImplemented
+        return {self.concert1, self.concert2} == {other.concert1, other.concert2}
+
+    def __hash__(self) -> int:
+        return hash(frozenset((self.concert1, self.concert2)))
@@ -0,0 +1,29 @@
+import random
+
+import pytest
+
+from lolla.scheduling.annealing import COOLING_SCHEDULES, anneal_schedule_conflicts
+from lolla.scheduling.constraints import get_conflict_masks
+from lolla.scheduling.generate_schedule import CanNotConvergeError, generate_initial_schedule
+
+
+@pytest.mark.parametrize("cooling", sorted(COOLING_SCHEDULES))
+def test_annealing_reaches_zero_cost(cooling):
+    random.seed(0)
+    for _ in range(10):
+        try:
+            grid = anneal_schedule_conflicts(generate_initial_schedule(constructive=False), cooling=cooling)
+        except CanNotConvergeError:
+            continue
+        assert get_conflict_masks(grid).count() == 0
+        return
+    pytest.fail("Annealing never converged")
+
+
+def test_cooling_schedules_cool_down():
+    for cooling_cls in COOLING_SCHEDULES.values():
+        cooling = cooling_cls()
+        for _ in range(5000):
+            cooling.step(accepted=True)
+        assert cooling.temperature < cooling.initial_temperature
+        assert cooling.reset() == cooling.initial_temperature
@@ -0,0 +1,36 @@
+import random
+
+import pytest
+
+from lolla.app import app as app_module
+from lolla.app.schedule_store import ScheduleStore
+from lolla.scheduling.generate_schedule import CanNotConvergeError, generate_initial_schedule
+
+
+def _handle_schedule_generation(app):
+    return next(
+        spec["callback"].__wrapped__
+        for spec in app.callback_map.values()
+        if spec["inputs"][0]["id"] == "start-btn"
+    )
+
+
+@pytest.mark.parametrize("has_best_schedule", [True, False])
+def test_failed_generation_shows_an_alert(monkeypatch, has_best_schedule):
+    best_schedule = generate_initial_schedule(random.Random(0)) if has_best_schedule else None
+
+    def fail(**kwargs):
+        raise CanNotConvergeError("out of attempts", schedule=best_schedule, num_conflicts=3)
+
+    monkeypatch.setattr(app_module, "generate_valid_schedule", fail)
+    store = ScheduleStore()
+    app = app_module.create_app(schedule_store=store)
+    schedule_id, state, _, _, message, color, is_open = _handle_schedule_generation(app)(1, 0)
+
+    assert is_open and message
+    if has_best_schedule:
+        # The closest schedule found is served, with a warning
+        assert state == "schedule" and color == "warning"
+        assert store.get(schedule_id) is not None
+    else:
+        assert state is app_module.dash.no_update and color == "danger"
@@ -0,0 +1,40 @@
+import random
+
+import pytest
+
+from lolla.scheduling.artists import CATALOG, Artist, ArtistSize, Genre
+
+
+def test_sampler_draws_without_replacement():
+    sampler = CATALOG.sampler(random.Random(0))
+    drawn = []
+    while (artist := sampler.draw(ArtistSize.SMALL)) is not None:
+        assert artist.size == ArtistSize.SMALL
+        drawn.append(artist.name)
+
+    num_small = sum(len(CATALOG.buckets[ArtistSize.SMALL, genre]) for genre in Genre)
+    assert len(drawn) == len(set(drawn)) == num_small
+
+
+def test_sampler_respects_genre_cap():
+    sampler = CATALOG.sampler(random.Random(0))
+    while sampler.draw(ArtistSize.MEDIUM, max_per_genre=2) is not None:
+        pass
+    assert all(count == 2 for count in sampler.count_per_genre.values())
+
+
+def test_deserialized_artists_are_interned():
+    artist = CATALOG.buckets[ArtistSize.LARGE, Genre.POP][0]
+    assert Artist.from_dict(artist.to_dict()) is artist
+    assert Artist.from_str(repr(artist)) is artist
+
+    outsider = Artist("Not In The Catalog", ArtistSize.SMALL, Genre.EDM)
+    assert Artist.from_dict(outsider.to_dict()) == outsider
+
+
+def test_artists_are_immutable_and_hashable():
+    artist = CATALOG.buckets[ArtistSize.SMALL, Genre.RAP][0]
+    with pytest.raises(AttributeError):
+        artist.name = "Someone else"
+    assert len({artist, Artist(artist.name, artist.size, artist.genre)}) == 1
+
@@ -0,0 +1,31 @@
+import json
+
+from lolla.scheduling.benchmark import benchmark_generation, benchmark_repair, find_regressions
+
+
+def test_generation_benchmark_reports_distributions():
+    result = benchmark_generation("swap", num_runs=3).to_dict()
+    assert result["num_runs"] == 3
+    assert result["num_failures"] == 0
+    assert result["seconds"]["p50"] <= result["seconds"]["p95"] <= result["seconds"]["p99"] <= result["seconds"]["max"]
+    assert result["restarts"]["max"] >= 0
+    json.dumps(result)
+
+
+def test_repair_benchmark_records_convergence_curve():
+    result = benchmark_repair("anneal", num_runs=3, curve_points=10)
+    assert result.iterations["max"] > 0
+    assert 0 < len(result.convergence_curve) <= 10
+    iterations = [iteration for iteration, _ in result.convergence_curve]
+    assert iterations == sorted(iterations)
+    # Every run starts from a random schedule with conflicts and ends without any
+    assert result.convergence_curve[0][1] > result.convergence_curve[-1][1]
+
+
+def test_find_regressions():
+    def results(p50, p95, num_failures=0):
+        return {"results": {"generate/swap": {"seconds": {"p50": p50, "p95": p95}, "num_failures": num_failures}}}
+
+    assert find_regressions(results(1.0, 2.0), results(1.1, 2.1)) == []
+    assert len(find_regressions(results(1.0, 2.0), results(1.5, 2.0))) == 1
+    assert len(find_regressions(results(1.0, 2.0), results(1.0, 2.0, num_failures=1))) == 1
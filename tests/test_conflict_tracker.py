@@ -0,0 +1,68 @@
+import random
+
+from lolla.scheduling.artists import ArtistSize
+from lolla.scheduling.conflict_tracker import ConflictTracker
+from lolla.scheduling.constraints import (
+    Constraint,
+    get_conflict_masks,
+    register_constraint,
+    unregister_constraint,
+)
+from lolla.scheduling.generate_schedule import generate_initial_schedule
+from lolla.scheduling.wrappers import ScheduleConflict
+
+
+def test_tracker_matches_full_rescan_after_swaps():
+    random.seed(0)
+    grid = generate_initial_schedule(constructive=False)
+    tracker = ConflictTracker(grid)
+
+    for _ in range(500):
+        num_before = get_conflict_masks(grid).count()
+        delta = tracker.swap(
+            random.randrange(grid.num_hours),
+            random.randrange(grid.num_stages),
+            random.randrange(grid.num_hours),
+            random.randrange(grid.num_stages),
+        )
+        num_after = get_conflict_masks(grid).count()
+
+        assert tracker.num_conflicts == num_after
+        assert delta == num_after - num_before
+
+
+def _large_artist_on_first_stage(grid, stage_idx, hour_idx):
+    artist = grid.artist_at(hour_idx, stage_idx)
+    if stage_idx == 0 and artist is not None and artist.size == ArtistSize.LARGE:
+        concert = grid.concert_at(hour_idx, stage_idx)
+        return ScheduleConflict(concert, concert)
+
+
+def _large_artist_on_first_stage_mask(grid, rules):
+    mask = grid.size_values() == ArtistSize.LARGE.value
+    mask[:, 1:] = False
+    return mask
+
+
+def test_tracker_keeps_custom_constraints_up_to_date():
+    register_constraint(
+        Constraint("large_artist_on_first_stage", _large_artist_on_first_stage, _large_artist_on_first_stage_mask)
+    )
+    try:
+        random.seed(1)
+        grid = generate_initial_schedule(constructive=False)
+        tracker = ConflictTracker(grid)
+        assert len(tracker.default_weights) == len(get_conflict_masks(grid).names)
+
+        for _ in range(300):
+            tracker.swap(
+                random.randrange(grid.num_hours),
+                random.randrange(grid.num_stages),
+                random.randrange(grid.num_hours),
+                random.randrange(grid.num_stages),
+            )
+            masks = get_conflict_masks(grid)
+            assert tracker.num_conflicts == masks.count()
+            assert tracker.conflict_counts[-1] == masks["large_artist_on_first_stage"].sum()
+    finally:
+        unregister_constraint("large_artist_on_first_stage")
@@ -1,19 +1,124 @@
-import pandas as pd
+import random
 
-from lolla.scheduling.constants import HOURS, ArtistSize
-from lolla.scheduling.constraints import is_any_stage_booked_consecutively, are_any_neighbors_simultaneous, ScheduleConflict
+from lolla.scheduling.artists import Artist, ArtistSize, Genre
+from lolla.scheduling.constants import HOURS, STAGES
+from lolla.scheduling.constraints import (
+    check_for_conflicts,
+    get_all_schedule_conflicts,
+    get_conflict_masks,
+    is_stage_booked_consecutively,
+    is_neighbor_booked_simultaneously,
+    is_size_window_violated,
+    is_artist_booked_more_than_once,
+    ScheduleConflict,
+)
+from lolla.scheduling.generate_schedule import generate_initial_schedule
+from lolla.scheduling.grid import ScheduleGrid
+from lolla.scheduling.layout import FestivalLayout
 
 
+SMALL_ARTIST = Artist("Small Test Artist", ArtistSize.SMALL, Genre.POP)
+MEDIUM_ARTIST = Artist("Medium Test Artist", ArtistSize.MEDIUM, Genre.RAP)
 
 
 def test_consecutive_bookings():
-    schedule_with_consecutive = pd.DataFrame(data={
-        "Test Stage": [pd.NA, pd.NA, ArtistSize.SMALL, ArtistSize.MEDIUM]
-    })
-    consecutive_conflict = is_any_stage_booked_consecutively(schedule_with_consecutive)
-    expected_conflict = ScheduleConflict(ArtistSize.SMALL, 2, "Test Stage", ArtistSize.MEDIUM, 3, "Test Stage")
-    assert expected_conflict == consecutive_conflict
+    grid = ScheduleGrid.empty(HOURS, ["Test Stage"])
+    grid.book(2, 0, SMALL_ARTIST)
+    grid.book(3, 0, MEDIUM_ARTIST)
 
+    consecutive_conflict = is_stage_booked_consecutively(grid, 0, 2)
+    assert isinstance(consecutive_conflict, ScheduleConflict)
+    assert consecutive_conflict.concert1.artist == SMALL_ARTIST
+    assert consecutive_conflict.concert1.hour == HOURS[2]
+    assert consecutive_conflict.concert2.artist == MEDIUM_ARTIST
+    assert consecutive_conflict.concert2.hour == HOURS[3]
+    assert is_stage_booked_consecutively(grid, 0, 3) is None
 
 
+def test_neighbor_bookings():
+    grid = ScheduleGrid.empty(HOURS, STAGES)
+    grid.book(0, grid.stage_index("Bud Light"), SMALL_ARTIST)
+    grid.book(0, grid.stage_index("Bacardi"), MEDIUM_ARTIST)
+    assert is_neighbor_booked_simultaneously(grid, grid.stage_index("Bud Light"), 0) is None
 
+    grid.book(0, grid.stage_index("Tito's"), MEDIUM_ARTIST)
+    assert is_neighbor_booked_simultaneously(grid, grid.stage_index("Bud Light"), 0) is not None
+
+
+def test_size_window():
+    grid = ScheduleGrid.empty(HOURS, STAGES)
+    grid.book(0, 0, MEDIUM_ARTIST)
+    grid.book(0, 1, SMALL_ARTIST)
+    assert is_size_window_violated(grid, 0, 0) is not None
+    assert is_size_window_violated(grid, 1, 0) is None
+
+
+def test_grid_dataframe_round_trip():
+    grid = ScheduleGrid.empty(HOURS, STAGES)
+    grid.book(4, 2, SMALL_ARTIST)
+
+    schedule_df = grid.to_df()
+    assert schedule_df.loc[HOURS[4], STAGES[2]] == SMALL_ARTIST
+    assert schedule_df.isna().sum().sum() == len(HOURS) * len(STAGES) - 1
+
+    round_tripped = ScheduleGrid.from_df(schedule_df)
+    assert round_tripped.artist_at(4, 2) == SMALL_ARTIST
+    assert round_tripped.artist_at(0, 0) is None
+
+
+def test_conflict_masks_match_scalar_predicates():
+    random.seed(0)
+    for _ in range(20):
+        grid = generate_initial_schedule(constructive=False)
+        masks = get_conflict_masks(grid).as_tuple()
+        for stage_idx in range(grid.num_stages):
+            for hour_idx in range(grid.num_hours):
+                conflict = check_for_conflicts(grid, stage_idx, hour_idx)
+                flagged = [bool(mask[hour_idx, stage_idx]) for mask in masks]
+                assert (conflict is not None) == any(flagged)
+
+        assert len(get_all_schedule_conflicts(grid)) == get_conflict_masks(grid).count()
+
+
+def test_day_boundary_is_not_back_to_back():
+    grid = ScheduleGrid.empty(HOURS, ["Test Stage"], num_days=2)
+    last_hour_of_day_one = grid.hour_index(HOURS[-1], day=1)
+    grid.book(last_hour_of_day_one, 0, SMALL_ARTIST)
+    grid.book(grid.hour_index(HOURS[0], day=2), 0, MEDIUM_ARTIST)
+
+    assert is_stage_booked_consecutively(grid, 0, last_hour_of_day_one) is None
+    assert not get_conflict_masks(grid)["stage_booked_consecutively"].any()
+
+
+def test_stage_minimum_is_per_day():
+    grid = ScheduleGrid.empty(HOURS, ["Test Stage"], num_days=2)
+    for hour in HOURS[::2][:3]:
+        grid.book(grid.hour_index(hour, day=1), 0, Artist(f"Artist {hour}", ArtistSize.SMALL, Genre.POP))
+
+    understaffed = get_conflict_masks(grid)["slot_free_and_not_enough_performances_today"]
+    assert not understaffed[: len(HOURS)].any()
+    assert understaffed[len(HOURS) :].all()
+
+
+def test_artist_plays_once_per_festival():
+    grid = ScheduleGrid.empty(HOURS, STAGES, num_days=3)
+    grid.book(grid.hour_index(HOURS[0], day=1), 0, SMALL_ARTIST)
+    grid.book(grid.hour_index(HOURS[1], day=3), 2, SMALL_ARTIST)
+
+    conflict = is_artist_booked_more_than_once(grid, 0, grid.hour_index(HOURS[0], day=1))
+    assert conflict is not None
+    assert (conflict.concert2.day, conflict.concert2.hour) == (3, HOURS[1])
+    assert get_conflict_masks(grid)["artist_booked_more_than_once"].sum() == 2
+
+
+def test_multi_day_dataframe_round_trip():
+    layout = FestivalLayout(num_days=2)
+    grid = ScheduleGrid.for_layout(layout)
+    grid.book(grid.hour_index(HOURS[4], day=2), 2, SMALL_ARTIST)
+
+    schedule_df = grid.to_df()
+    assert schedule_df.loc[(2, HOURS[4]), STAGES[2]] == SMALL_ARTIST
+
+    round_tripped = ScheduleGrid.from_df(schedule_df)
+    assert round_tripped.layout == layout
+    assert round_tripped.artist_at(len(HOURS) + 4, 2) == SMALL_ARTIST
@@ -0,0 +1,104 @@
+import random
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from lolla.scheduling.generate_schedule import (
+    CanNotConvergeError,
+    RestartController,
+    fix_schedule_conflicts,
+    generate_initial_schedule,
+    generate_schedule_with_report,
+    generate_valid_schedule,
+)
+from lolla.scheduling.constraints import get_conflict_masks
+from lolla.scheduling.grid import ScheduleGrid
+from lolla.scheduling.layout import FestivalLayout
+
+
+def test_report_tracks_attempts():
+    report = generate_schedule_with_report("swap", seed=0)
+    assert report.is_valid
+    assert report.num_attempts == len(report.attempts) >= 1
+    assert report.attempts[-1].converged
+    assert all(attempt.seconds >= 0 for attempt in report.attempts)
+
+
+def test_restarts_are_bounded():
+    def never_converges():
+        raise CanNotConvergeError("stuck", schedule=None, num_conflicts=3)
+
+    report = RestartController(max_attempts=5).run(never_converges)
+    assert report.num_attempts == 5
+    assert not report.is_valid
+
+
+def test_generate_valid_schedule_raises_when_out_of_attempts(monkeypatch):
+    def never_converges(grid, **kwargs):
+        raise CanNotConvergeError("stuck", schedule=grid, num_conflicts=1)
+
+    monkeypatch.setattr("lolla.scheduling.generate_schedule.fix_schedule_conflicts", never_converges)
+    with pytest.raises(CanNotConvergeError) as exc_info:
+        generate_valid_schedule(max_attempts=3)
+    assert exc_info.value.num_conflicts == 1
+    assert exc_info.value.schedule is not None
+
+
+@pytest.mark.parametrize("strategy", ["swap", "anneal"])
+def test_same_seed_gives_same_schedule(strategy):
+    schedule1 = generate_valid_schedule(strategy, seed=1234)
+    schedule2 = generate_valid_schedule(strategy, seed=1234)
+    assert schedule1.to_csv() == schedule2.to_csv()
+
+    assert generate_valid_schedule(strategy, seed=4321).to_csv() != schedule1.to_csv()
+
+
+@pytest.mark.parametrize("strategy", ["swap", "anneal"])
+def test_multi_day_schedule(strategy):
+    layout = FestivalLayout(stages=("Main", "Side", "Tent", "Grove"), num_days=3)
+    schedule_df = generate_valid_schedule(strategy, seed=7, layout=layout)
+    assert list(schedule_df.index.names) == ["day", "hour"]
+    assert list(schedule_df.columns) == list(layout.stages)
+
+    artists = [artist.name for artist in schedule_df.stack().dropna()]
+    assert len(artists) == len(set(artists))
+    assert get_conflict_masks(ScheduleGrid.from_df(schedule_df)).count() == 0
+
+
+def test_quiet_repair_loop_formats_nothing(monkeypatch):
+    def fail_to_format(self):
+        raise AssertionError("formatted a concert in quiet mode")
+
+    monkeypatch.setattr("lolla.scheduling.wrappers.Concert.__repr__", fail_to_format)
+    monkeypatch.setattr("lolla.scheduling.wrappers.ScheduleConflict.__str__", fail_to_format)
+    grid = generate_initial_schedule(random.Random(0), constructive=False)
+    try:
+        fix_schedule_conflicts(grid, max_iterations=200, rng=random.Random(0))
+    except CanNotConvergeError:
+        pass
+
+
+def test_validation_checks_the_final_schedule(monkeypatch):
+    validated = []
+    monkeypatch.setattr(
+        "lolla.scheduling.generate_schedule.validate_schedule", lambda schedule_df, layout: validated.append(schedule_df)
+    )
+    schedule_df = generate_valid_schedule(seed=0)
+    assert len(validated) == 1 and validated[0] is schedule_df
+
+    generate_valid_schedule(seed=0, validate=False)
+    assert len(validated) == 1
+
+
+def test_pandera_is_only_imported_for_validation():
+    code = (
+        "import sys\n"
+        "from lolla.scheduling.generate_schedule import generate_valid_schedule\n"
+        "generate_valid_schedule(seed=0, validate=False)\n"
+        "assert 'pandera' not in sys.modules\n"
+        "generate_valid_schedule(seed=0)\n"
+        "assert 'pandera' in sys.modules\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True, cwd=Path(__file__).parent.parent)
@@ -0,0 +1,51 @@
+import time
+
+import pytest
+
+from lolla.scheduling.constraints import Constraint, get_conflict_masks, register_constraint, unregister_constraint
+from lolla.scheduling.generate_schedule import CanNotConvergeError, generate_valid_schedule
+from lolla.scheduling.grid import EMPTY
+from lolla.scheduling.ilp import generate_ilp_schedule
+from lolla.scheduling.layout import FestivalLayout
+
+
+def test_ilp_schedule_has_no_conflicts():
+    grid = generate_ilp_schedule()
+    assert get_conflict_masks(grid).count() == 0
+
+    artist_names = [artist.name for artist in grid.artists]
+    assert len(artist_names) == len(set(artist_names))
+
+
+def test_ilp_schedule_is_deterministic():
+    assert (generate_ilp_schedule().cells == generate_ilp_schedule().cells).all()
+    assert (generate_ilp_schedule(seed=1).cells == generate_ilp_schedule(seed=1).cells).all()
+
+
+def _booked_in_first_two_hours_mask(grid, rules):
+    mask = grid.cells != EMPTY
+    mask[2:] = False
+    return mask
+
+
+def test_ilp_rejects_schedules_violating_custom_constraints():
+    register_constraint(
+        Constraint("booked_in_first_two_hours", lambda grid, stage_idx, hour_idx: None, _booked_in_first_two_hours_mask)
+    )
+    try:
+        with pytest.raises(CanNotConvergeError) as excinfo:
+            generate_valid_schedule("ilp", seed=0, max_attempts=2, validate=False)
+        assert excinfo.value.num_conflicts > 0
+        assert get_conflict_masks(excinfo.value.schedule).count() == excinfo.value.num_conflicts
+    finally:
+        unregister_constraint("booked_in_first_two_hours")
+
+
+def test_ilp_attempt_stops_within_max_seconds():
+    # A multi-day ILP takes far longer than this to prove optimal, so only the time limit can stop it
+    start = time.perf_counter()
+    try:
+        generate_valid_schedule("ilp", seed=1, layout=FestivalLayout(num_days=2), max_seconds=2, validate=False)
+    except CanNotConvergeError:
+        pass
+    assert time.perf_counter() - start < 2 + 1.5
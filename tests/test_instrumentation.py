@@ -0,0 +1,44 @@
+import random
+
+from lolla.scheduling.generate_schedule import (
+    CanNotConvergeError,
+    fix_schedule_conflicts,
+    generate_initial_schedule,
+    generate_valid_schedule,
+)
+from lolla.scheduling.instrumentation import SolverStats
+
+
+def test_generation_fills_in_stats():
+    stats = SolverStats()
+    generate_valid_schedule("anneal", seed=0, stats=stats)
+
+    assert stats.generations == stats.valid_generations == 1
+    assert stats.attempts == stats.restarts + 1
+    assert {"initialization", "repair", "validation"} <= set(stats.phase_seconds)
+
+
+def test_repair_counts_swaps():
+    stats = SolverStats()
+    grid = generate_initial_schedule(random.Random(0), constructive=False)
+    try:
+        fix_schedule_conflicts(grid, max_iterations=300, rng=random.Random(0), stats=stats)
+    except CanNotConvergeError:
+        assert sum(stats.remaining_conflicts.values()) > 0
+
+    assert stats.iterations == stats.accepted_swaps + stats.rejected_swaps > 0
+    assert 0 < stats.acceptance_rate <= 1
+    assert sum(stats.initial_conflicts.values()) > 0
+
+
+def test_prometheus_export():
+    stats, other = SolverStats(), SolverStats(iterations=5, accepted_swaps=1, rejected_swaps=3)
+    other.record_conflicts({"size_window_violated": 2})
+    stats.merge(other)
+    stats.merge(other)
+
+    text = stats.to_prometheus()
+    assert "# TYPE lolla_solver_iterations_total counter" in text
+    assert "lolla_solver_iterations_total 10\n" in text
+    assert "lolla_solver_acceptance_rate 0.25\n" in text
+    assert 'lolla_solver_initial_conflicts_total{constraint="size_window_violated"} 4\n' in text
@@ -0,0 +1,14 @@
+from lolla.scheduling.constraints import get_conflict_masks
+from lolla.scheduling.grid import ScheduleGrid
+from lolla.scheduling.parallel import generate_schedule_batch, generate_valid_schedule_parallel
+
+
+def test_parallel_generation_returns_valid_schedule():
+    schedule_df = generate_valid_schedule_parallel(num_workers=2)
+    assert get_conflict_masks(ScheduleGrid.from_df(schedule_df)).count() == 0
+
+
+def test_batch_returns_distinct_schedules():
+    schedules = generate_schedule_batch(3, num_workers=2)
+    assert len(schedules) == 3
+    assert len({schedule_df.to_csv() for schedule_df in schedules}) == 3
@@ -0,0 +1,26 @@
+import random
+
+from lolla.scheduling.artists import ArtistSize
+from lolla.scheduling.constraints import get_conflict_masks
+from lolla.scheduling.generate_schedule import generate_initial_schedule
+from lolla.scheduling.grid import ScheduleGrid
+from lolla.scheduling.placement import FreeSlotIndex
+
+
+def test_constructive_schedule_only_uses_legal_slots():
+    for seed in range(20):
+        grid = generate_initial_schedule(random.Random(seed), constructive=True)
+        masks = get_conflict_masks(grid)
+        assert not masks["stage_booked_consecutively"].any()
+        assert not masks["neighbor_booked_simultaneously"].any()
+        assert not masks["size_window_violated"].any()
+
+
+def test_occupying_a_slot_blocks_its_surroundings():
+    grid = ScheduleGrid.empty()
+    free_slots = FreeSlotIndex(grid)
+    num_free = free_slots.num_free(ArtistSize.MEDIUM)
+
+    # 5 PM at Bud Light blocks 4 PM and 6 PM there, and 5 PM at its neighbor Tito's
+    free_slots.occupy(grid.hour_index(17), grid.stage_index("Bud Light"))
+    assert free_slots.num_free(ArtistSize.MEDIUM) == num_free - 4
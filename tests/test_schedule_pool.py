@@ -0,0 +1,32 @@
+import time
+
+from lolla.app.schedule_pool import SchedulePool
+from lolla.scheduling.instrumentation import SolverStats
+
+
+def _wait_for(condition, timeout: float = 30.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def test_pool_fills_up_and_refills():
+    stats = SolverStats()
+    pool = SchedulePool(size=2, num_workers=2, strategy="anneal", validate=False, stats=stats).start()
+    try:
+        assert _wait_for(lambda: len(pool) == 2)
+        schedule_df = pool.get()
+        assert not schedule_df.empty
+        assert _wait_for(lambda: len(pool) == 2)
+        assert stats.valid_generations >= 3
+    finally:
+        pool.stop()
+
+
+def test_empty_pool_generates_on_demand():
+    pool = SchedulePool(size=1, strategy="anneal", validate=False)
+    assert len(pool) == 0
+    assert not pool.get().empty
@@ -0,0 +1,35 @@
+import random
+
+from lolla.app.schedule_store import ScheduleStore
+from lolla.app.utils import serialize_schedule_df
+from lolla.scheduling.generate_schedule import generate_initial_schedule
+
+
+def _schedule_df(seed: int):
+    return generate_initial_schedule(random.Random(seed)).to_df()
+
+
+def test_store_evicts_least_recently_used():
+    store = ScheduleStore(max_entries=2)
+    first, second = store.put(_schedule_df(0)), store.put(_schedule_df(1))
+    store.get(first)
+    third = store.put(_schedule_df(2))
+
+    assert len(store) == 2
+    assert store.get(second) is None
+    assert store.get(first) is not None and store.get(third) is not None
+    assert store.get("unknown") is None and store.get(None) is None
+
+
+def test_store_falls_back_to_disk(tmp_path):
+    schedule_df = _schedule_df(0)
+    store = ScheduleStore(max_entries=1, directory=tmp_path)
+    schedule_id = store.put(schedule_df)
+    store.put(_schedule_df(1))
+
+    # Evicted from memory, but still on disk (and visible to other stores sharing the directory)
+    for reader in (store, ScheduleStore(directory=tmp_path)):
+        loaded = reader.get(schedule_id)
+        assert serialize_schedule_df(loaded) == serialize_schedule_df(schedule_df)
+        assert list(loaded.index) == list(schedule_df.index)
+    assert store.get("../secrets") is None
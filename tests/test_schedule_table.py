@@ -0,0 +1,19 @@
+import random
+
+from lolla.app.schedule_table import get_highlight_style, get_schedule_datatable_data
+from lolla.scheduling.generate_schedule import generate_initial_schedule
+
+
+def test_highlight_is_separate_from_cell_styles():
+    schedule_df = generate_initial_schedule(random.Random(0)).to_df()
+    data, columns, cell_styles = get_schedule_datatable_data(schedule_df)
+
+    assert len(data) == len(schedule_df)
+    assert [column["id"] for column in columns] == ["Time", *schedule_df.columns]
+    assert len(cell_styles) == schedule_df.notna().sum().sum()
+    assert all("column_id" in style["if"] for style in cell_styles)
+
+    # The highlight rule comes first, ahead of the cell colors
+    _, _, highlighted_styles = get_schedule_datatable_data(schedule_df, highlight_row=2)
+    assert highlighted_styles == get_highlight_style(2, len(data)) + cell_styles
+    assert get_highlight_style(len(data), len(data)) == []
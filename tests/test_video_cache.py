@@ -0,0 +1,62 @@
+import pytest
+
+from lolla.app.video_cache import DAY, VideoCache
+from lolla.app.video_providers import LocalVideoProvider
+from lolla.app.youtube import get_youtube_video_id, warm_up_video_cache
+from lolla.scheduling.artists import CATALOG, ArtistSize, Genre
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_cache_expires_found_and_missing_videos_separately(tmp_path):
+    clock = FakeClock()
+    cache = VideoCache(tmp_path / "videos.sqlite3", ttl=10 * DAY, negative_ttl=DAY, clock=clock)
+    cache.set("Hozier", "abc123")
+    cache.set("Nobody", None)
+
+    clock.now = 2 * DAY
+    assert cache.get("Hozier").video_id == "abc123"
+    assert cache.get("Nobody") is None
+    assert cache.get("Unknown") is None
+
+    # Entries survive reopening the database
+    clock.now = 11 * DAY
+    reopened = VideoCache(tmp_path / "videos.sqlite3", ttl=20 * DAY, clock=clock)
+    assert reopened.get("Hozier").video_id == "abc123"
+    assert cache.get("Hozier") is None
+
+
+def test_get_or_fetch_caches_results_but_not_errors(tmp_path):
+    cache = VideoCache(tmp_path / "videos.sqlite3")
+    calls = []
+
+    def fetch(artist_name):
+        calls.append(artist_name)
+        if artist_name == "Broken":
+            raise RuntimeError("quota exceeded")
+        return None
+
+    assert cache.get_or_fetch("Nobody", fetch) is None
+    assert cache.get_or_fetch("Nobody", fetch) is None
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            cache.get_or_fetch("Broken", fetch)
+    assert calls == ["Nobody", "Broken", "Broken"]
+
+
+def test_warm_up_skips_cached_artists(tmp_path):
+    cache = VideoCache(tmp_path / "videos.sqlite3")
+    artists = CATALOG.buckets[ArtistSize.SMALL, Genre.RAP][:3]
+    provider = LocalVideoProvider({artist.name: f"video-{artist.name}" for artist in artists})
+
+    cache.set(artists[0].name, "cached")
+    assert warm_up_video_cache(artists, cache, provider=provider) == 2
+    assert get_youtube_video_id(artists[0].name, cache) == "cached"
+    assert get_youtube_video_id(artists[1].name, cache) == f"video-{artists[1].name}"
+    assert warm_up_video_cache(artists, cache, refresh=True, provider=provider) == 3
@@ -0,0 +1,157 @@
+import random
+import threading
+import time
+
+from lolla.app.app import create_app
+from lolla.app.schedule_store import ScheduleStore
+from lolla.app.video_lookup import VideoLookup
+from lolla.app.video_modal import LOADING_MESSAGE
+from lolla.app.video_cache import DAY, VideoCache
+from lolla.app.video_providers import CachedVideoProvider, LocalVideoProvider
+from lolla.scheduling.artists import Artist
+from lolla.scheduling.generate_schedule import generate_initial_schedule
+
+
+def test_concurrent_lookups_of_an_artist_are_deduplicated():
+    calls = []
+    release = threading.Event()
+
+    class SlowProvider:
+        def find_video_id(self, artist_name):
+            calls.append(artist_name)
+            release.wait(5)
+            return "abc123"
+
+    lookup = VideoLookup(SlowProvider())
+    first, second = lookup.submit("Hozier"), lookup.submit("Hozier")
+    assert first is second and lookup.get("Hozier") is first
+    release.set()
+    assert first.result(timeout=5) == "abc123"
+
+    # Once a lookup has finished, looking the artist up again starts a new one
+    assert lookup.submit("Hozier").result(timeout=5) == "abc123"
+    assert calls == ["Hozier", "Hozier"]
+    assert lookup.get("Unknown") is None
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _callback(app, input_id):
+    """The undecorated function of the server callback triggered by the component `input_id`."""
+    return next(
+        spec["callback"].__wrapped__
+        for spec in app.callback_map.values()
+        if spec["inputs"][0]["id"] == input_id and "callback" in spec
+    )
+
+
+def test_slow_lookup_shows_loading_then_video():
+    store = ScheduleStore()
+    schedule_df = generate_initial_schedule(random.Random(0)).to_df()
+    schedule_id = store.put(schedule_df)
+    row, stage = next(
+        (row, stage) for row in range(len(schedule_df)) for stage in schedule_df.columns
+        if isinstance(schedule_df.iloc[row][stage], Artist)
+    )
+    artist = schedule_df.iloc[row][stage]
+    provider = LocalVideoProvider({artist.name: "abc123"}, latency=0.3)
+    app = create_app(schedule_store=store, video_provider=provider)
+    play_video_on_click = _callback(app, "schedule-table")
+    poll_video_lookup = _callback(app, "video-lookup-poll")
+
+    modal, lookup_artist, poll_disabled = play_video_on_click({"row": row, "column_id": stage}, schedule_id)
+    assert LOADING_MESSAGE in str(modal)
+    assert lookup_artist == artist.to_dict() and not poll_disabled
+
+    time.sleep(0.5)
+    modal, lookup_artist, poll_disabled = poll_video_lookup(1, lookup_artist)
+    assert "abc123" in str(modal)
+    assert lookup_artist is None and poll_disabled
+
+
+def test_prefetch_skips_artists_being_looked_up():
+    release = threading.Event()
+    calls = []
+
+    class SlowProvider:
+        def find_video_id(self, artist_name):
+            calls.append(artist_name)
+            release.wait(5)
+            return f"video-{artist_name}"
+
+    lookup = VideoLookup(SlowProvider(), prefetch_workers=1)
+    assert lookup.prefetch(["Hozier", "Broken", "Daya"]) == 3
+    # "Daya" is still queued behind "Hozier", so clicking her cancels the prefetch and looks her up right away
+    clicked = lookup.submit("Daya")
+    assert lookup.submit("Hozier") is lookup.get("Hozier")
+    assert lookup.prefetch(["Hozier", "Broken", "Daya"]) == 0
+    release.set()
+    assert clicked.result(timeout=5) == "video-Daya"
+    lookup.get("Broken").result(timeout=5)
+    assert sorted(calls) == ["Broken", "Daya", "Hozier"]
+
+
+def test_moving_the_highlight_prefetches_current_and_next_hour():
+    store = ScheduleStore()
+    schedule_df = generate_initial_schedule(random.Random(0)).to_df()
+    schedule_id = store.put(schedule_df)
+    requested = []
+
+    class RecordingProvider:
+        def find_video_id(self, artist_name):
+            requested.append(artist_name)
+            return None
+
+    app = create_app(schedule_store=store, video_provider=RecordingProvider())
+
+    assert _callback(app, "highlight-index")(3, schedule_id) == 3
+    expected = {
+        artist.name for artist in schedule_df.iloc[3:5].to_numpy().ravel() if isinstance(artist, Artist)
+    }
+    deadline = time.monotonic() + 5
+    while len(requested) < len(expected) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert set(requested) == expected
+
+
+class CountingProvider(LocalVideoProvider):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.calls = []
+
+    def find_video_id(self, artist_name):
+        self.calls.append(artist_name)
+        return super().find_video_id(artist_name)
+
+
+def test_click_after_prefetch_hits_the_cache():
+    provider = CountingProvider({"Hozier": "abc123"}, latency=0.3)
+    lookup = VideoLookup(CachedVideoProvider(provider, VideoCache(":memory:")))
+    lookup.prefetch(["Hozier"])
+    lookup.get("Hozier").result(timeout=5)
+
+    start = time.perf_counter()
+    assert lookup.submit("Hozier").result(timeout=5) == "abc123"
+    assert time.perf_counter() - start < 0.1
+    assert provider.calls == ["Hozier"]
+
+
+def test_expired_cache_entries_are_looked_up_again():
+    clock = FakeClock()
+    provider = CountingProvider({})
+    lookup = VideoLookup(CachedVideoProvider(provider, VideoCache(":memory:", negative_ttl=DAY, clock=clock)))
+    assert lookup.submit("Nobody").result(timeout=5) is None
+    assert lookup.submit("Nobody").result(timeout=5) is None
+    assert provider.calls == ["Nobody"]
+
+    # Past the negative TTL the provider is asked again
+    clock.now = 10 * DAY
+    provider.videos["Nobody"] = "abc123"
+    assert lookup.submit("Nobody").result(timeout=5) == "abc123"
+    assert provider.calls == ["Nobody", "Nobody"]
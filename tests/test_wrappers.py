@@ -0,0 +1,24 @@
+import numpy as np
+import pytest
+
+from lolla.scheduling.artists import CATALOG, ArtistSize, Genre
+from lolla.scheduling.wrappers import Concert, ScheduleConflict
+
+
+def test_concert_validation():
+    artist = CATALOG.buckets[ArtistSize.SMALL, Genre.RAP][0]
+    Concert(artist, "Bud Light", 12)
+    Concert(None, "Bud Light", np.int64(12), day=2)
+    with pytest.raises(ValueError):
+        Concert(ArtistSize.SMALL, "Bud Light", 12)
+    with pytest.raises(ValueError):
+        Concert(artist, 3, 12)
+    with pytest.raises(ValueError):
+        Concert(artist, "Bud Light", "noon")
+
+
+def test_conflicts_compare_regardless_of_order():
+    artist = CATALOG.buckets[ArtistSize.SMALL, Genre.RAP][0]
+    concert1, concert2 = Concert(artist, "Bud Light", 12), Concert(None, "Tito's", 12)
+    assert ScheduleConflict(concert1, concert2) == ScheduleConflict(concert2, concert1)
+    assert len({ScheduleConflict(concert1, concert2), ScheduleConflict(concert2, concert1)}) == 1
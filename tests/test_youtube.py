@@ -0,0 +1,89 @@
+import json
+import threading
+import time
+
+from lolla.app import youtube
+from lolla.app.video_cache import VideoCache
+from lolla.app.video_providers import CachedVideoProvider, LocalVideoProvider
+
+
+class FakeResponse:
+    def __init__(self, payload, status_code=200):
+        self.payload = payload
+        self.status_code = status_code
+        self.text = str(payload)
+
+    def json(self):
+        return self.payload
+
+
+class FakeSession:
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    def get(self, url, params=None, timeout=None):
+        self.calls.append((url, params, timeout))
+        return self.responses.pop(0)
+
+
+def test_embeddability_is_checked_in_one_request():
+    search = {
+        "items": [
+            {"id": {"videoId": video_id}, "snippet": {"title": title}}
+            for video_id, title in [("a", "Song (Live)"), ("b", "Song"), ("c", "Other Song"), ("d", "Hit")]
+        ]
+    }
+    # Returned out of order, with "b" not embeddable
+    details = {
+        "items": [
+            {"id": "d", "status": {"embeddable": True}},
+            {"id": "c", "status": {"embeddable": True}},
+            {"id": "b", "status": {"embeddable": False}},
+        ]
+    }
+    session = FakeSession(FakeResponse(search), FakeResponse(details))
+    provider = youtube.YouTubeProvider(api_key="key", session=session)
+
+    assert provider.find_video_id("Hozier") == "c"
+    assert len(session.calls) == 2
+    assert session.calls[1][1]["id"] == "b,c,d"
+    assert all(timeout == youtube.REQUEST_TIMEOUT for _, _, timeout in session.calls)
+
+
+def test_local_provider_reads_mapping_and_waits(tmp_path):
+    fixtures = tmp_path / "videos.json"
+    fixtures.write_text(json.dumps({"Hozier": "abc123", "Nobody": None}))
+    provider = LocalVideoProvider.from_file(fixtures, latency=0.05)
+
+    start = time.perf_counter()
+    assert provider.find_video_id("Hozier") == "abc123"
+    assert time.perf_counter() - start >= 0.05
+    assert provider.find_video_id("Nobody") is None
+    assert provider.find_video_id("Unknown") is None
+
+
+def test_cached_provider_only_asks_once(tmp_path):
+    calls = []
+
+    class CountingProvider:
+        def find_video_id(self, artist_name):
+            calls.append(artist_name)
+            return None
+
+    provider = CachedVideoProvider(CountingProvider(), VideoCache(tmp_path / "videos.sqlite3"))
+    assert provider.find_video_id("Nobody") is None
+    assert provider.find_video_id("Nobody") is None
+    assert calls == ["Nobody"]
+
+
+def test_each_thread_gets_its_own_session():
+    sessions = []
+    threads = [threading.Thread(target=lambda: sessions.append(youtube._thread_session())) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len({id(session) for session in sessions}) == 3
+    assert youtube._thread_session() is youtube._thread_session()